@@ -0,0 +1,182 @@
+"""
+Content-addressed on-disk embedding cache.
+
+Wraps any LangChain embeddings object (e.g. HuggingFaceEmbeddings) so that
+re-ingesting unchanged chunks is a lookup instead of a model call.
+
+Layout of <cache_dir>/<model name>/:
+    vectors.f32  - float32 rows, append-only, read through np.memmap
+    keys.bin     - 32-byte sha256 digest per row, same order as vectors.f32
+    meta.json    - {"model": ..., "dim": ...}
+    .lock        - flock()ed while appending, so several worker processes
+                   can share one cache directory
+
+Keys are sha256(model name + normalised chunk text), so the same text is
+never embedded twice for the same model.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+KEY_SIZE = 32
+
+
+def normalise(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive advisory lock shared by every process using the same cache dir."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class EmbeddingStore:
+    """Append-only, memory-mapped store of vectors addressed by content hash."""
+
+    def __init__(self, path: str, model_name: str):
+        self.path = path
+        self.model_name = model_name
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.keys_path = os.path.join(path, "keys.bin")
+        self.meta_path = os.path.join(path, "meta.json")
+        self.lock_path = os.path.join(path, ".lock")
+        self.dim = None
+        self.rows = {}  # digest -> row number
+        self._matrix = None
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        with self._lock, _file_lock(self.lock_path):
+            self._sync()
+
+    def _sync(self):
+        """
+        Picks up rows appended since the last call (by this or another
+        process). Must be called with the file lock held.
+        """
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+
+        key_bytes, vector_bytes = _size(self.keys_path), _size(self.vectors_path)
+        # Rows are only valid once both files have them (an interrupted write is dropped)
+        count = min(key_bytes // KEY_SIZE, vector_bytes // (self.dim * 4))
+        known = len(self.rows)
+        if count > known:
+            with open(self.keys_path, "rb") as f:
+                f.seek(known * KEY_SIZE)
+                tail = f.read((count - known) * KEY_SIZE)
+            for i in range(count - known):
+                self.rows[tail[i * KEY_SIZE:(i + 1) * KEY_SIZE]] = known + i
+            self._matrix = None
+        if key_bytes != count * KEY_SIZE or vector_bytes != count * self.dim * 4:
+            self._truncate(count)
+
+    def _truncate(self, count: int):
+        with open(self.keys_path, "r+b") as f:
+            f.truncate(count * KEY_SIZE)
+        with open(self.vectors_path, "r+b") as f:
+            f.truncate(count * self.dim * 4)
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\0{normalise(text)}".encode("utf-8")).digest()
+
+    def _matrix_view(self):
+        if self._matrix is None or len(self._matrix) < len(self.rows):
+            self._matrix = np.memmap(self.vectors_path, dtype="float32", mode="r",
+                                     shape=(len(self.rows), self.dim))
+        return self._matrix
+
+    def get_many(self, keys: list) -> dict:
+        """Return {key: vector} for the keys that are cached."""
+        with self._lock:
+            found = {k: self.rows[k] for k in keys if k in self.rows}
+            if not found:
+                return {}
+            matrix = self._matrix_view()
+            return {k: np.array(matrix[row]) for k, row in found.items()}
+
+    def add_many(self, keys: list, vectors: list):
+        with self._lock, _file_lock(self.lock_path):
+            self._sync()  # ✅ Another process may have appended (some of) these already
+            new = [(k, v) for k, v in zip(keys, vectors) if k not in self.rows]
+            if not new:
+                return
+            block = np.asarray([v for _, v in new], dtype="float32")
+            if self.dim is None:
+                self.dim = block.shape[1]
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+                open(self.vectors_path, "ab").close()
+                open(self.keys_path, "ab").close()
+
+            # Row numbers come from the file, not from this process's view of it
+            start = _size(self.keys_path) // KEY_SIZE
+            # Vectors first, then keys: a key on disk always has its vector
+            with open(self.vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(k for k, _ in new))
+
+            for i, (k, _) in enumerate(new):
+                self.rows[k] = start + i
+            self._matrix = None
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper: cached chunks are read from disk, only new ones hit the model."""
+
+    def __init__(self, embeddings, model_name: str = None, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.embeddings = embeddings
+        self.model_name = model_name or getattr(embeddings, "model_name", None) or getattr(embeddings, "model", "default")
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name)
+        self.store = EmbeddingStore(os.path.join(cache_dir, safe_name), self.model_name)
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: list) -> list:
+        keys = [self.store.key(t) for t in texts]
+        cached = self.store.get_many(keys)
+
+        missing = {}  # key -> first text with that key
+        for k, t in zip(keys, texts):
+            if k not in cached and k not in missing:
+                missing[k] = t
+        self.hits += len(texts) - sum(1 for k in keys if k in missing)
+        self.misses += len(missing)
+
+        if missing:
+            new_vectors = self.embeddings.embed_documents(list(missing.values()))
+            self.store.add_many(list(missing), new_vectors)
+            cached.update(zip(missing, (np.asarray(v, dtype="float32") for v in new_vectors)))
+
+        return [cached[k].tolist() for k in keys]
+
+    def embed_query(self, text: str) -> list:
+        # Queries are rarely repeated verbatim; they go straight to the model
+        return self.embeddings.embed_query(text)
@@ -2,6 +2,7 @@ from langchain_community.document_loaders import TextLoader
 from langchain.text_splitter import CharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from embedding_cache import CachedEmbeddings
 from langchain_community.llms import Ollama
 from langchain.chains import RetrievalQA
 
@@ -15,7 +16,7 @@ def build_rag_chain():
     docs = splitter.split_documents(documents)
 
     # Embed and index
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    embeddings = CachedEmbeddings(HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"))
     vectordb = FAISS.from_documents(docs, embeddings)
     retriever = vectordb.as_retriever()
 
@@ -1,9 +1,10 @@
 from crewai import Agent, Task, Crew
 from langchain_ollama import Ollama  # ✅ this is the correct modern one
 
-def get_crew_agent():
-    llm = Ollama(model="gemma:2b")
+llm = Ollama(model="gemma:2b")  # ✅ One client shared by every crew
+
 
+def get_crew_agent():
     agent = Agent(
         role="Helpful Assistant",
         goal="Answer user questions clearly and informatively",
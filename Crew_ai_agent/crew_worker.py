@@ -0,0 +1,84 @@
+import os
+import uuid
+import queue
+import threading
+import traceback
+from db import QA, session_scope
+
+CREW_WORKERS = int(os.getenv("CREW_WORKERS", "2"))
+CREW_QUEUE_SIZE = int(os.getenv("CREW_QUEUE_SIZE", "16"))
+JOB_HISTORY = 500
+
+
+class CrewJob:
+    def __init__(self, question: str):
+        self.id = uuid.uuid4().hex
+        self.question = question
+        self.status = "queued"
+        self.answer = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {"job_id": self.id, "status": self.status, "question": self.question, "answer": self.answer}
+
+
+class CrewWorkerPool:
+    """
+    Fixed number of worker threads, each holding its own crew built once at
+    start-up (a Crew keeps per-run state, so one instance is not shared
+    between concurrent kickoffs). Submissions beyond the admission queue are
+    refused instead of spawning more threads.
+    """
+
+    def __init__(self, build_crew, workers=CREW_WORKERS, queue_size=CREW_QUEUE_SIZE):
+        self.build_crew = build_crew
+        self.jobs = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, question: str) -> CrewJob:
+        """Raises queue.Full when the admission queue is at capacity."""
+        job = CrewJob(question)
+        with self._lock:
+            self.jobs[job.id] = job
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                del self.jobs[job.id]
+                raise
+            if len(self.jobs) > JOB_HISTORY:
+                finished = [j for j in self.jobs.values() if j.done.is_set()]
+                for old in finished[:len(self.jobs) - JOB_HISTORY]:
+                    del self.jobs[old.id]
+        return job
+
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        crew = self.build_crew()  # ✅ Built once per worker, reused for every kickoff
+        while True:
+            job = self._queue.get()
+            job.status = "running"
+            try:
+                result = crew.kickoff(inputs={"input": job.question})
+                job.answer = str(result)
+                job.status = "done"
+                print("CrewAI result:", result)
+            except Exception:
+                print("CrewAI Error:")
+                traceback.print_exc()
+                job.answer = "Sorry, an error occurred while processing your question."
+                job.status = "failed"
+
+            # Store Q&A in database
+            try:
+                with session_scope() as db:
+                    db.add(QA(question=job.question, answer=job.answer))
+            except Exception:
+                print("DB Error:")
+                traceback.print_exc()
+            job.done.set()
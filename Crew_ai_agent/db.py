@@ -1,9 +1,45 @@
-from sqlalchemy import create_engine, Column, Integer, String
+import os
+from datetime import datetime
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, inspect, text, tuple_, Column, Integer, String, DateTime, Index
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-engine = create_engine('sqlite:///qa.db')
-SessionLocal = sessionmaker(bind=engine)
+DB_URL = os.getenv("QA_DB_URL", "sqlite:///qa.db")
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+
+IS_SQLITE = make_url(DB_URL).get_backend_name() == "sqlite"
+
+# 👉 Pool sizing only for server databases; SQLite keeps its dialect's default pool
+# (NullPool on SQLAlchemy 1.4 rejects pool_size/max_overflow)
+POOL_ARGS = {} if IS_SQLITE else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+}
+
+engine = create_engine(
+    DB_URL,
+    # 👉 sqlite3-only driver options; other databases get their driver defaults
+    connect_args={"check_same_thread": False, "timeout": 30} if IS_SQLITE else {},
+    pool_pre_ping=True,
+    **POOL_ARGS,
+)
+
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _):
+    if engine.dialect.name != "sqlite":
+        return
+    # ✅ WAL lets page renders read while a new answer is being written
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")    # safe with WAL, one fsync per checkpoint
+    cursor.execute("PRAGMA cache_size=-20000")     # ~20 MB page cache per connection
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
 Base = declarative_base()
 
 class QA(Base):
@@ -11,6 +47,58 @@ class QA(Base):
     id = Column(Integer, primary_key=True, index=True)
     question = Column(String)
     answer = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (Index("ix_qa_created_at_id", "created_at", "id"),)
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # 👉 Databases created before created_at existed: add the column, backfill, index it
+    columns = {c["name"] for c in inspect(engine).get_columns("qa")}
+    if "created_at" not in columns:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE qa ADD COLUMN created_at DATETIME"))
+            conn.execute(QA.__table__.update().where(QA.created_at.is_(None)).values(created_at=datetime.utcnow()))
+        for index in QA.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def get_db():
+    """FastAPI dependency: one session per request, always closed."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@contextmanager
+def session_scope():
+    """Session for work outside a request; commits on success, rolls back on error."""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def encode_cursor(qa: QA) -> str:
+    return f"{qa.created_at.isoformat()}_{qa.id}"
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, qa_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(qa_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+def recent_history(db, limit: int = HISTORY_PAGE_SIZE, before: str = None):
+    """Newest-first page of Q&A plus the cursor for the next (older) page, or None."""
+    query = db.query(QA)
+    if before:
+        created_at, qa_id = decode_cursor(before)
+        query = query.filter(tuple_(QA.created_at, QA.id) < tuple_(created_at, qa_id))
+    rows = query.order_by(QA.created_at.desc(), QA.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -1,47 +1,98 @@
-from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, Form, Depends, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from db import QA, SessionLocal, init_db
+from sqlalchemy.orm import Session
+from db import init_db, get_db, recent_history
 from crew_config import get_crew_agent
-import traceback
+from crew_worker import CrewWorkerPool
+import json
+import queue
+import asyncio
 
 app = FastAPI()
 templates = Jinja2Templates(directory="templates")
 
 init_db()
+crew_pool = CrewWorkerPool(get_crew_agent)  # 👉 CREW_WORKERS threads, CREW_QUEUE_SIZE admission slots
+JOB_POLL_INTERVAL = 0.5  # seconds between SSE status checks
+PAGE_REFRESH_SECONDS = 3  # no-JS page reload interval while its question is pending
+
+def render(request: Request, db: Session, before: str = None, job_id: str = None):
+    # ✅ Only the newest page is loaded; "Load older" follows the keyset cursor
+    try:
+        history, next_cursor = recent_history(db, before=before)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'before' cursor")
+    # 👉 No-JS clients come back here with ?job=...; the page reloads itself until it is done
+    job = crew_pool.jobs.get(job_id) if job_id else None
+    pending = job if job is not None and not job.done.is_set() else None
+    return templates.TemplateResponse("index.html", {
+        "request": request, "history": history, "next_cursor": next_cursor,
+        "pending": pending, "refresh_seconds": PAGE_REFRESH_SECONDS,
+    })
+
 
 @app.get("/", response_class=HTMLResponse)
-def read_form(request: Request):
-    db = SessionLocal()
-    history = db.query(QA).all()
-    db.close()
-    return templates.TemplateResponse("index.html", {"request": request, "history": history})
+def read_form(request: Request, before: str = None, job: str = None, db: Session = Depends(get_db)):
+    return render(request, db, before, job)
+
 
+def wants_html(request: Request) -> bool:
+    """A browser form post without JavaScript, as opposed to the page's fetch() call."""
+    accept = request.headers.get("accept", "")
+    return "text/html" in accept and "application/json" not in accept
 
-@app.post("/ask", response_class=HTMLResponse)
+
+@app.post("/ask")
 def handle_question(request: Request, question: str = Form(...)):
     print("Received question:", question)
-
     try:
-        crew = get_crew_agent()
-        result = crew.kickoff(inputs={"input": question})
-        print("CrewAI result:", result)
-    except Exception as e:
-        print("CrewAI Error:")
-        traceback.print_exc()
-        result = "Sorry, an error occurred while processing your question."
-
-    # Store Q&A in database
-    try:
-        db = SessionLocal()
-        qa = QA(question=question, answer=result)
-        db.add(qa)
-        db.commit()
-        history = db.query(QA).all()
-        db.close()
-    except Exception as db_err:
-        print("DB Error:")
-        traceback.print_exc()
-        history = []
-
-    return templates.TemplateResponse("index.html", {"request": request, "history": history})
+        job = crew_pool.submit(question)
+    except queue.Full:
+        # ✅ Shed load instead of piling up threads behind multi-second agent runs
+        if wants_html(request):
+            return HTMLResponse("Too many questions in progress. Please go back and retry shortly.",
+                                status_code=429, headers={"Retry-After": "5"})
+        return JSONResponse(
+            status_code=429,
+            content={"error": "Too many questions in progress. Please retry shortly."},
+            headers={"Retry-After": "5"},
+        )
+    if wants_html(request):
+        # 👉 No-JS fallback: redirect at once, the index page shows the job until it finishes
+        return RedirectResponse(url=f"/?job={job.id}", status_code=303)
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = crew_pool.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+def sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def job_events(job):
+    status = None
+    while not job.done.is_set():
+        if job.status != status:
+            status = job.status
+            yield sse(job.to_dict())
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+    yield sse(job.to_dict())  # ✅ Final state always sent, even if it changed since the last check
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_stream(job_id: str):
+    job = crew_pool.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,93 @@
+"""
+Recall / latency report for the FAISS index types against the exact flat baseline.
+
+Vectors come from the saved index (vectorstore/index.faiss) or, with
+--synthetic N, from N random clustered vectors to preview larger corpora.
+A sample of --queries vectors (plus a little noise) is searched one query
+at a time, as the API does. Ground truth is the exact flat search.
+
+    python bench_index.py --k 15 --queries 500
+    python bench_index.py --synthetic 1000000 --types ivf_sq8 ivf_pq hnsw_sq8
+"""
+import argparse
+import time
+import faiss
+import numpy as np
+from config import INDEX_PARAMS, VECTORSTORE_PATH
+from utils.faiss_index import INDEX_TYPES, new_index, prepare_index
+
+NPROBE_SWEEP = (1, 4, 8, 16, 32, 64)
+EF_SEARCH_SWEEP = (16, 32, 64, 128, 256)
+
+
+def load_vectors(synthetic: int, dim: int = 384) -> np.ndarray:
+    if synthetic:
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(max(1, synthetic // 1000), dim)).astype("float32")
+        labels = rng.integers(0, len(centers), size=synthetic)
+        return centers[labels] + 0.3 * rng.normal(size=(synthetic, dim)).astype("float32")
+    index = faiss.read_index(VECTORSTORE_PATH)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def timed_search(index, queries: np.ndarray, k: int):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        _, ids = index.search(q[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(ids[0])
+    return np.array(results), np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--synthetic", type=int, default=0, help="benchmark N random vectors instead of the saved index")
+    parser.add_argument("--train-sample", type=int, default=50000)
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    args = parser.parse_args()
+
+    base = np.ascontiguousarray(load_vectors(args.synthetic), dtype="float32")
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(base), size=min(args.queries, len(base)), replace=False)
+    queries = base[picks] + 0.01 * rng.normal(size=(len(picks), base.shape[1])).astype("float32")
+    print(f"{len(base)} vectors, dim {base.shape[1]}, {len(queries)} queries, k={args.k}\n")
+
+    flat = faiss.IndexFlatL2(base.shape[1])
+    flat.add(base)
+    truth, _, _ = timed_search(flat, queries, args.k)
+
+    header = f"{'index':<10}{'param':<14}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}{'MB':>10}{'build s':>10}"
+    print(header)
+    print("-" * len(header))
+    for index_type in args.types:
+        start = time.perf_counter()
+        index = new_index(index_type, base.shape[1], len(base), INDEX_PARAMS)
+        if not index.is_trained:
+            sample = base[rng.choice(len(base), size=min(args.train_sample, len(base)), replace=False)]
+            index.train(sample)
+        index.add(base)
+        build_s = time.perf_counter() - start
+        size_mb = len(faiss.serialize_index(index)) / 1e6
+
+        if faiss.try_extract_index_ivf(index) is not None:
+            sweep = [("nprobe", n, dict(nprobe=n, ef_search=0)) for n in NPROBE_SWEEP]
+        elif hasattr(index, "hnsw"):
+            sweep = [("efSearch", ef, dict(nprobe=0, ef_search=max(ef, args.k))) for ef in EF_SEARCH_SWEEP]
+        else:
+            sweep = [("-", "", dict(nprobe=0, ef_search=0))]
+
+        for name, value, params in sweep:
+            prepare_index(index, **params)
+            found, p50, p95 = timed_search(index, queries, args.k)
+            param = f"{name}={value}" if value != "" else name
+            print(f"{index_type:<10}{param:<14}{recall(found, truth):>10.3f}{p50:>10.3f}{p95:>10.3f}{size_mb:>10.1f}{build_s:>10.1f}")
@@ -0,0 +1,43 @@
+"""
+Check the vectorised MMR (utils/mmr.py) against LangChain's
+maximal_marginal_relevance and time both, for growing fetch_k.
+
+    python bench_mmr.py --queries 200 --k 15
+"""
+import argparse
+import time
+import numpy as np
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
+from utils.mmr import mmr_select
+
+FETCH_K_SWEEP = (20, 50, 100, 200, 400)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'fetch_k':>8}{'match':>8}{'langchain ms':>14}{'vectorised ms':>15}{'batched ms':>12}")
+    for fetch_k in FETCH_K_SWEEP:
+        queries = rng.normal(size=(args.queries, args.dim)).astype("float32")
+        candidates = rng.normal(size=(args.queries, fetch_k, args.dim)).astype("float32")
+        valid = np.ones((args.queries, fetch_k), dtype=bool)
+
+        start = time.perf_counter()
+        expected = [maximal_marginal_relevance(q[None, :], list(c), k=args.k) for q, c in zip(queries, candidates)]
+        langchain_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+        start = time.perf_counter()
+        single = [mmr_select(q[None, :], c[None], v[None], args.k)[0] for q, c, v in zip(queries, candidates, valid)]
+        single_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+        start = time.perf_counter()
+        mmr_select(queries, candidates, valid, args.k)
+        batched_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+        match = np.mean([list(e) == list(s) for e, s in zip(expected, single)])
+        print(f"{fetch_k:>8}{match:>8.3f}{langchain_ms:>14.3f}{single_ms:>15.3f}{batched_ms:>12.3f}")
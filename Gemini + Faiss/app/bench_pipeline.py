@@ -0,0 +1,56 @@
+"""
+Before/after benchmark of the per-request setup cost in /ask.
+
+"before": rebuild retriever + ChatGroq + RetrievalQA on every call (old get_rag_response)
+"after":  reuse the long-lived RAGPipeline built at startup
+
+Only chain construction is timed, so no Groq request is made.
+Run from the app/ folder:  python bench_pipeline.py --runs 200
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "bench-placeholder")
+
+from langchain.chains import RetrievalQA
+from langchain_groq import ChatGroq
+from rag_chain import PROMPT, pipeline
+
+
+def rebuild_per_request():
+    s = pipeline.settings
+    retriever = pipeline.vectorstore.as_retriever(
+        search_type="mmr", search_kwargs={"k": s["k"], "fetch_k": s["fetch_k"]}
+    )
+    return RetrievalQA.from_chain_type(
+        llm=ChatGroq(model=s["model"], temperature=s["temperature"]),
+        retriever=retriever,
+        chain_type_kwargs={"prompt": PROMPT}
+    )
+
+
+def reuse_pipeline():
+    return pipeline.retriever, pipeline.llm  # what RAGPipeline.run uses; nothing is built per request
+
+
+def measure(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'mode':<22}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, fn in (("before (per request)", rebuild_per_request), ("after (pipeline)", reuse_pipeline)):
+        mean, p50, p95 = measure(fn, args.runs)
+        print(f"{name:<22}{mean:>10.3f}{p50:>10.3f}{p95:>10.3f}")
@@ -0,0 +1,86 @@
+"""
+Concurrency benchmark: current sync pymongo writes vs the async SessionRepository.
+
+Both variants run N concurrent "ask" coroutines on one event loop. Each
+coroutine checks that the session exists and then appends a user/bot
+message pair, the same database work /ask does.
+  sync  -> find_one + two update_one $push calls on pymongo (blocks the loop)
+  async -> SessionRepository: motor find_one + one insert_many (awaits)
+
+Event-loop lag is measured with a 10 ms ticker, which shows how long other
+requests would be stalled.
+
+Run from the app/ folder (uses MONGO_URI and a throwaway collection):
+    python bench_sessions.py --concurrency 200 --rounds 5
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from db import client as async_client, SessionRepository
+
+load_dotenv()
+BENCH_COLLECTION = "chat_sessions_bench"
+
+
+def make_messages():
+    now = datetime.utcnow()
+    return {"role": "user", "text": "q", "timestamp": now}, {"role": "bot", "text": "a", "timestamp": now}
+
+
+async def ticker(stop, lags):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+async def run(name, ask, concurrency, rounds):
+    stop, lags = asyncio.Event(), []
+    tick = asyncio.create_task(ticker(stop, lags))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(ask() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    total = concurrency * rounds
+    print(f"{name:<6} {total / elapsed:>10.1f} req/s   max loop lag {max(lags, default=0) * 1000:>8.1f} ms")
+
+
+async def main(concurrency, rounds):
+    sync_coll = MongoClient(os.getenv("MONGO_URI"))["chatbot"][BENCH_COLLECTION]
+    repo = SessionRepository(
+        async_client["chatbot"][BENCH_COLLECTION],
+        async_client["chatbot"][BENCH_COLLECTION + "_messages"],
+    )
+    session_id = sync_coll.insert_one({"messages": [], "is_deleted": False}).inserted_id
+
+    async def ask_sync():
+        sync_coll.find_one({"_id": session_id, "is_deleted": False})
+        user_msg, bot_msg = make_messages()
+        sync_coll.update_one({"_id": session_id}, {"$push": {"messages": user_msg}})
+        sync_coll.update_one({"_id": session_id}, {"$push": {"messages": bot_msg}})
+
+    async def ask_async():
+        await repo.exists(session_id)
+        await repo.append_messages(session_id, *make_messages())
+
+    try:
+        print(f"concurrency={concurrency} rounds={rounds}")
+        await run("sync", ask_sync, concurrency, rounds)
+        await run("async", ask_async, concurrency, rounds)
+    finally:
+        sync_coll.drop()
+        sync_coll.database[BENCH_COLLECTION + "_messages"].drop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.rounds))
@@ -3,4 +3,59 @@ import os
 DATA_PATH = "data"
 VECTORSTORE_DIR = "vectorstore"
 VECTORSTORE_PATH = os.path.join(VECTORSTORE_DIR, "index.faiss")
+MANIFEST_PATH = os.path.join(VECTORSTORE_DIR, "manifest.json")
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+
+# ✅ RAG pipeline defaults (can be changed at runtime via /rag-config)
+LLM_MODEL = os.getenv("LLM_MODEL", "llama3-70b-8192")
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0"))
+RETRIEVER_K = int(os.getenv("RETRIEVER_K", "15"))
+RETRIEVER_FETCH_K = int(os.getenv("RETRIEVER_FETCH_K", "20"))
+
+# ✅ Pooled HTTP connections to the LLM backend
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+
+# ✅ Semantic answer cache in front of /ask
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))  # cosine similarity
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))  # seconds
+
+# ✅ Translation layer
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google")  # "google" or "identity" (offline)
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "5000"))
+
+# ✅ Paginated session history
+MESSAGE_PAGE_SIZE = int(os.getenv("MESSAGE_PAGE_SIZE", "50"))
+MESSAGE_PAGE_MAX = int(os.getenv("MESSAGE_PAGE_MAX", "500"))
+
+# ✅ /sessions listing and archiving of soft-deleted sessions
+SESSION_PAGE_SIZE = int(os.getenv("SESSION_PAGE_SIZE", "50"))
+SESSION_PAGE_MAX = int(os.getenv("SESSION_PAGE_MAX", "200"))
+SESSION_ARCHIVE_INTERVAL = int(os.getenv("SESSION_ARCHIVE_INTERVAL", "3600"))  # seconds, 0 disables
+
+# ✅ Ingestion pipeline (see utils/parallel_ingest.py)
+CHUNK_SIZE = 2000
+CHUNK_OVERLAP = 400
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "8"))  # embedding batches buffered between stages
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # bytes per read when spooling uploads to disk
+
+# ✅ FAISS index type (see utils/faiss_index.py):
+#    flat | ivf_flat | ivf_sq8 | ivf_pq | hnsw | hnsw_sq8
+# Changing it rebuilds the index from the embedding cache on next start / reindex.
+INDEX_TYPE = os.getenv("INDEX_TYPE", "flat")
+INDEX_TRAIN_SAMPLE = int(os.getenv("INDEX_TRAIN_SAMPLE", "50000"))  # vectors used to train IVF / PQ / SQ
+INDEX_PARAMS = {
+    "ivf_nlist": int(os.getenv("IVF_NLIST", "0")),  # 0 = ~4*sqrt(n)
+    "pq_m": int(os.getenv("PQ_M", "48")),  # bytes per vector for ivf_pq
+    "pq_nbits": int(os.getenv("PQ_NBITS", "8")),
+    "hnsw_m": int(os.getenv("HNSW_M", "32")),
+    "hnsw_ef_construction": int(os.getenv("HNSW_EF_CONSTRUCTION", "200")),
+}
+# Query-time defaults, also adjustable at runtime via /rag-config
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "16"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+INDEX_META_PATH = os.path.join(VECTORSTORE_DIR, "index_meta.json")
@@ -1,15 +1,170 @@
- 
-
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
+
+# ✅ Non-blocking client with a tuned connection pool
+client = AsyncIOMotorClient(
+    MONGO_URI,
+    maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "10")),
+    maxIdleTimeMS=int(os.getenv("MONGO_MAX_IDLE_MS", "60000")),
+    waitQueueTimeoutMS=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+    serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+)
 
 db = client["chatbot"]
 sessions = db["chat_sessions"]
+messages = db["chat_messages"]  # ✅ One document per message, indexed by (session_id, timestamp)
+sessions_archive = db["chat_sessions_archive"]
+messages_archive = db["chat_messages_archive"]
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cursor(doc: dict, field: str = "timestamp") -> str:
+    """Opaque keyset cursor: '<doc[field] in ms>-<document id>'."""
+    # Documents written before `field` existed sort as the epoch (migrate_messages.py backfills them)
+    ms = (doc.get(field, EPOCH) - EPOCH) // timedelta(milliseconds=1)
+    return f"{ms}-{doc['_id']}"
+
+
+def decode_cursor(cursor: str):
+    try:
+        ms, message_id = cursor.split("-", 1)
+        return EPOCH + timedelta(milliseconds=int(ms)), ObjectId(message_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class SessionRepository:
+    """Async access to chat sessions; every call awaits instead of blocking the event loop."""
+
+    def __init__(self, collection, message_collection, archive=None, message_archive=None):
+        self.collection = collection
+        self.messages = message_collection
+        self.archive = archive
+        self.message_archive = message_archive
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            [("is_deleted", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        await self.messages.create_index(
+            [("session_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)]
+        )
+
+    async def create(self, name: str = "New Chat") -> str:
+        inserted = await self.collection.insert_one({
+            "created_at": datetime.utcnow(),
+            "session_name": name,
+            "is_deleted": False
+        })
+        return str(inserted.inserted_id)
+
+    async def exists(self, session_obj_id) -> bool:
+        session = await self.collection.find_one(
+            {"_id": session_obj_id, "is_deleted": False}, {"_id": 1}
+        )
+        return session is not None
+
+    async def soft_delete(self, session_obj_id) -> bool:
+        result = await self.collection.update_one(
+            {"_id": session_obj_id, "is_deleted": False},
+            {"$set": {"is_deleted": True}}
+        )
+        return result.matched_count > 0
+
+    async def rename(self, session_obj_id, new_name: str) -> bool:
+        result = await self.collection.update_one(
+            {"_id": session_obj_id, "is_deleted": False},
+            {"$set": {"session_name": new_name}}
+        )
+        return result.matched_count > 0
+
+    async def get_messages(self, session_obj_id, limit: int, before: str = None, after: str = None):
+        """
+        One page of messages in chronological order plus a has-more flag.
+        Without a cursor the newest `limit` messages are returned; `before` pages
+        towards older messages, `after` towards newer ones.
+        """
+        query = {"session_id": session_obj_id}
+        newest_first = after is None
+        cursor = before or after
+        if cursor:
+            ts, message_id = decode_cursor(cursor)
+            op = "$lt" if before else "$gt"
+            query["$or"] = [
+                {"timestamp": {op: ts}},
+                {"timestamp": ts, "_id": {op: message_id}},
+            ]
+
+        order = DESCENDING if newest_first else ASCENDING
+        found = await self.messages.find(
+            query, {"role": 1, "text": 1, "timestamp": 1}
+        ).sort([("timestamp", order), ("_id", order)]).limit(limit + 1).to_list(length=limit + 1)
+
+        has_more = len(found) > limit
+        found = found[:limit]
+        if newest_first:
+            found.reverse()
+        return found, has_more
+
+    async def list_active(self, limit: int, after: str = None):
+        """
+        One page of active sessions, newest first, plus the cursor of the next
+        page (None on the last page). Served by the (is_deleted, created_at) index.
+        """
+        query = {"is_deleted": False}
+        if after:
+            created_at, session_id = decode_cursor(after)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": session_id}},
+            ]
+
+        found = await self.collection.find(
+            query, {"session_name": 1, "created_at": 1}
+        ).sort([("created_at", DESCENDING), ("_id", DESCENDING)]).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = encode_cursor(found[limit - 1], "created_at") if len(found) > limit else None
+        return found[:limit], next_cursor
+
+    async def archive_deleted(self, batch_size: int = 500) -> int:
+        """Move soft-deleted sessions (and their messages) to the archive collections."""
+        moved = 0
+        while True:
+            batch = await self.collection.find({"is_deleted": True}).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                return moved
+            ids = [s["_id"] for s in batch]
+
+            session_messages = await self.messages.find({"session_id": {"$in": ids}}).to_list(length=None)
+            if session_messages:
+                await self.message_archive.delete_many({"_id": {"$in": [m["_id"] for m in session_messages]}})
+                await self.message_archive.insert_many(session_messages, ordered=False)
+                await self.messages.delete_many({"session_id": {"$in": ids}})
+
+            # Re-runs after a partial failure must not hit duplicate keys
+            await self.archive.delete_many({"_id": {"$in": ids}})
+            await self.archive.insert_many(batch, ordered=False)
+            await self.collection.delete_many({"_id": {"$in": ids}, "is_deleted": True})
+            moved += len(batch)
+
+    async def append_messages(self, session_obj_id, *new_messages):
+        """Store several messages in one round trip (a single insert_many)."""
+        await self.messages.insert_many(
+            [{**msg, "session_id": session_obj_id} for msg in new_messages],
+            ordered=True
+        )
+
+
+session_repo = SessionRepository(sessions, messages, sessions_archive, messages_archive)
 
-print("✅ MongoDB Connected")
+print("✅ MongoDB client ready")
@@ -0,0 +1,182 @@
+import os
+import json
+import hashlib
+from langchain_community.vectorstores import FAISS # FAISS for storing and retrieving embeddings
+from langchain_huggingface import HuggingFaceEmbeddings # HuggingFace model for generating embeddings
+from utils.embedding_cache import CachedEmbeddings # On-disk cache of chunk embeddings
+from utils.parallel_ingest import run_pipeline # Process-pool extraction + batched embedding
+from utils.faiss_index import IndexBuilder, prepare_index, copy_vectorstore, empty_vectorstore, index_type_of # Flat / IVF / PQ / HNSW index construction
+from config import (
+    DATA_PATH, VECTORSTORE_DIR, VECTORSTORE_PATH, MANIFEST_PATH, EMBEDDING_MODEL, EMBEDDING_CACHE_DIR,
+    CHUNK_SIZE, CHUNK_OVERLAP, INGEST_WORKERS, INGEST_BATCH_SIZE, INGEST_QUEUE_SIZE,
+    INDEX_TYPE, INDEX_PARAMS, INDEX_TRAIN_SAMPLE, INDEX_META_PATH, IVF_NPROBE, HNSW_EF_SEARCH,
+)
+
+
+
+# from langchain_community.document_loaders import (
+#     PyPDFLoader, 
+#     CSVLoader,       # ✅ for CSV files
+#     JSONLoader,      # ✅ for JSON files
+#     UnstructuredWordDocumentLoader  # ✅ for Word files
+# )
+
+
+embeddings = CachedEmbeddings(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL), EMBEDDING_MODEL, EMBEDDING_CACHE_DIR)
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's contents, read in 1 MB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest() -> dict:
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def current_index_meta() -> dict:
+    """Settings the saved index was built with; a mismatch triggers a rebuild."""
+    return {"index_type": "flat"} if INDEX_TYPE == "flat" else {"index_type": INDEX_TYPE, **INDEX_PARAMS}
+
+
+def load_index_meta() -> dict:
+    """Settings the saved index was requested with; `built` (the type it really is) is left out."""
+    if not os.path.exists(INDEX_META_PATH):
+        return {"index_type": "flat"}  # indexes saved before this file existed were flat
+    with open(INDEX_META_PATH, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    meta.pop("built", None)
+    return meta
+
+
+def save_index(vs, manifest: dict):
+    os.makedirs(VECTORSTORE_DIR, exist_ok=True)
+    vs.save_local(VECTORSTORE_DIR)
+    save_manifest(manifest)
+    with open(INDEX_META_PATH, "w", encoding="utf-8") as f:
+        # ✅ `built` differs from index_type when too few vectors forced a flat fallback
+        json.dump({**current_index_meta(), "built": index_type_of(vs.index)}, f, indent=2)
+
+
+def scan_data_dir() -> dict:
+    """Map every PDF in DATA_PATH to its content hash."""
+    if not os.path.isdir(DATA_PATH):
+        return {}
+    return {
+        file: file_hash(os.path.join(DATA_PATH, file))
+        for file in sorted(os.listdir(DATA_PATH))
+        if file.endswith(".pdf")
+    }
+
+
+def sync_index(vs, manifest: dict, current: dict, workers=INGEST_WORKERS, batch_size=INGEST_BATCH_SIZE,
+               in_place=True):
+    """
+    Apply the difference between the manifest and the data folder to `vs`.
+    With in_place=False a live `vs` is left untouched and the changes go into
+    a copy. Returns (vectorstore, manifest, summary); the vectorstore is
+    never None, an empty folder gives an empty flat index.
+    """
+    added = [f for f in current if f not in manifest]
+    changed = [f for f in current if f in manifest and manifest[f]["hash"] != current[f]]
+    removed = [f for f in manifest if f not in current]
+    summary = {"added": added, "changed": changed, "removed": removed}
+
+    # Approximate indexes can't drop vectors in place the way LangChain expects, and a
+    # new INDEX_TYPE needs a new index: rebuild instead (unchanged chunks come from the embedding cache).
+    # A flat fallback (too few vectors to train) is retried once new files arrive.
+    built = index_type_of(vs.index) if vs is not None else None
+    rebuild = vs is not None and (
+        load_index_meta() != current_index_meta()
+        or (built != "flat" and (changed or removed))
+        or (built != INDEX_TYPE and (added or changed))
+    )
+    if rebuild:
+        print(f"🔁 Rebuilding the FAISS index as '{INDEX_TYPE}'...")
+        vs, manifest = None, {}
+        summary["rebuilt"] = True
+    else:
+        # ✅ Drop chunks of removed / changed files by document ID
+        stale_ids = [doc_id for f in removed + changed for doc_id in manifest[f]["ids"]]
+        if vs is not None and not in_place and (added or changed or removed):
+            vs = copy_vectorstore(vs)  # ✅ Searches keep using the original until the caller swaps
+        if vs is not None and stale_ids:
+            vs.delete(stale_ids)
+        for f in removed:
+            manifest.pop(f)
+
+    # ✅ Embed only new / changed files, through the parallel pipeline
+    to_embed = [f for f in current if f not in manifest or manifest[f]["hash"] != current[f]]
+    if to_embed:
+        builder = IndexBuilder(
+            embeddings, vs, INDEX_TYPE,
+            {**INDEX_PARAMS, "nprobe": IVF_NPROBE, "ef_search": HNSW_EF_SEARCH},
+            INDEX_TRAIN_SAMPLE,
+        )
+
+        # Chunk IDs are '<file>:<hash prefix>:<page>:<n>'
+        sources = [(os.path.join(DATA_PATH, f), f"{f}:{current[f][:16]}") for f in to_embed]
+        stats = run_pipeline(
+            sources, embeddings, builder.add,
+            chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP,
+            workers=workers, batch_size=batch_size, queue_size=INGEST_QUEUE_SIZE,
+        )
+        vs = builder.finish()
+        for (_, prefix), f in zip(sources, to_embed):
+            manifest[f] = {"hash": current[f], "ids": stats["ids"][prefix]}
+            print(f"📄 Embedded {f} ({len(manifest[f]['ids'])} chunks)")
+
+    if vs is None:
+        # ✅ No documents (first start on an empty folder, or a rebuild after every PDF was removed)
+        print("⚠️ No PDFs in the data folder, serving an empty index")
+        vs = empty_vectorstore(embeddings)
+    return vs, manifest, summary
+
+
+def embed_documents_once(workers=INGEST_WORKERS, batch_size=INGEST_BATCH_SIZE):
+    """
+    Load the existing FAISS index and bring it up to date with DATA_PATH:
+    only added, changed or removed PDFs (per manifest.json) are touched.
+    """
+    vs = None
+    manifest = load_manifest()
+
+    if os.path.exists(VECTORSTORE_PATH) and os.path.exists(MANIFEST_PATH):
+        print("✅ Using existing FAISS index...")
+        vs = FAISS.load_local(
+            VECTORSTORE_DIR,
+            embeddings,
+            allow_dangerous_deserialization=True
+        )
+        prepare_index(vs.index, IVF_NPROBE, HNSW_EF_SEARCH)
+    elif os.path.exists(VECTORSTORE_PATH):
+        # Index built before the manifest existed: chunk IDs are unknown, rebuild once
+        print("⚠️ FAISS index has no manifest, rebuilding it once...")
+        manifest = {}
+    else:
+        print("🔄 Creating FAISS index for the first time...")
+        manifest = {}  # ✅ A manifest without its index would make every file look already embedded
+
+    vs, manifest, summary = sync_index(vs, manifest, scan_data_dir(), workers=workers, batch_size=batch_size)
+
+    if any(summary.values()):
+        save_index(vs, manifest)
+        print(f"✅ FAISS index updated: {summary}")
+
+    return vs
+
+
@@ -0,0 +1,17 @@
+"""
+Build / update the FAISS index from the PDFs in DATA_PATH without starting the API.
+
+    python ingest.py --workers 8 --batch-size 64
+"""
+import argparse
+from config import INGEST_WORKERS, INGEST_BATCH_SIZE
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental, parallel FAISS ingestion")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="PDF extraction processes")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="chunks per embedding call")
+    args = parser.parse_args()
+
+    from indexer import embed_documents_once
+    embed_documents_once(workers=args.workers, batch_size=args.batch_size)
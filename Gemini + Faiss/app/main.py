@@ -1,16 +1,30 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query as QueryParam
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
 import os
+import re
+import json
+import asyncio
 from dotenv import load_dotenv
 from bson import ObjectId
 from bson.errors import InvalidId
 from datetime import datetime
-from db import sessions
-from utils.translation import translate, detect_language
+from db import client, session_repo, encode_cursor
+from utils.translation import translate, translate_batch, detect_language, service as translation_service
 from utils.speech import speech_to_text
-from rag_chain import get_rag_response
-from models import Query, TextData, RenameRequest, Message
+from utils.uploads import save_upload
+from utils.metrics import span, inc, render as render_metrics, register_gauge, CONTENT_TYPE
+from utils.singleflight import AsyncSingleFlight, normalise_question
+from utils.semantic_cache import SemanticCache
+import rag_chain
+from rag_chain import get_rag_response, stream_rag_response, pipeline, reindex
+from models import Query, TextData, RenameRequest, Message, RAGConfig
+from config import (
+    ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL,
+    MESSAGE_PAGE_SIZE, MESSAGE_PAGE_MAX,
+    SESSION_PAGE_SIZE, SESSION_PAGE_MAX, SESSION_ARCHIVE_INTERVAL,
+)
 
 load_dotenv()
 app = FastAPI(title="RAG Chatbot API", version="1.0")
@@ -21,19 +35,60 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+
+# ✅ Semantic cache of English answers (same embedding model as the FAISS index)
+answer_cache = SemanticCache(
+    rag_chain.embeddings.embed_query,
+    threshold=ANSWER_CACHE_THRESHOLD,
+    max_entries=ANSWER_CACHE_SIZE,
+    ttl=ANSWER_CACHE_TTL,
 )
 
+# ✅ Cache sizes / translation hit counts, read at scrape time
+register_gauge("rag_cache_entries", lambda: answer_cache.stats()["entries"], cache="answers")
+register_gauge("rag_cache_entries", lambda: translation_service.stats()["entries"], cache="translations")
+register_gauge("rag_translation_cache_hits", lambda: translation_service.stats()["hits"])
+register_gauge("rag_translation_cache_misses", lambda: translation_service.stats()["misses"])
+register_gauge("rag_index_vectors", lambda: rag_chain.vectorstore.index.ntotal)
+
+# ✅ Identical questions asked at the same moment share one RAG run
+rag_flight = AsyncSingleFlight()
+register_gauge("rag_singleflight_leaders", lambda: rag_flight.leaders)
+register_gauge("rag_singleflight_coalesced", lambda: rag_flight.coalesced)
+
+async def archive_deleted_sessions():
+    """Background job: move soft-deleted sessions to the archive on a schedule."""
+    while True:
+        try:
+            moved = await session_repo.archive_deleted()
+            if moved:
+                print(f"🗄️ Archived {moved} deleted sessions")
+        except Exception as e:
+            print(f"❌ Session archive error: {e}")
+        await asyncio.sleep(SESSION_ARCHIVE_INTERVAL)
+
+background_tasks = []
+
+@app.on_event("startup")
+async def startup():
+    await session_repo.ensure_indexes()
+    if SESSION_ARCHIVE_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(archive_deleted_sessions()))
+
+@app.on_event("shutdown")
+async def close_clients():
+    for task in background_tasks:
+        task.cancel()
+    pipeline.close()
+    client.close()
+
 # ✅ Create a new chat session
 @app.post("/create-session")
 async def create_session():
-    session = {
-        "created_at": datetime.utcnow(),
-        "messages": [],
-        "session_name": "New Chat",
-        "is_deleted": False
-    }
-    inserted = sessions.insert_one(session)
-    return JSONResponse(content={"id": str(inserted.inserted_id)})
+    session_id = await session_repo.create()
+    return JSONResponse(content={"id": session_id})
 
 @app.put("/delete-session/{session_id}")
 async def delete_session(session_id: str):
@@ -43,12 +98,7 @@ async def delete_session(session_id: str):
     except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid session ID")
 
-    result = sessions.update_one(
-        {"_id": session_obj_id, "is_deleted": False},
-        {"$set": {"is_deleted": True}}
-    )
-
-    if result.matched_count == 0:
+    if not await session_repo.soft_delete(session_obj_id):
         raise HTTPException(status_code=404, detail="Session not found or already deleted")
 
     return JSONResponse(content={"message": "Session deleted successfully"})
@@ -62,79 +112,134 @@ async def rename_session(session_id: str, body: RenameRequest):
     except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid session ID")
 
-    result = sessions.update_one(
-        {"_id": session_obj_id, "is_deleted": False},
-        {"$set": {"session_name": body.new_name}}
-    )
-
-    if result.matched_count == 0:
+    if not await session_repo.rename(session_obj_id, body.new_name):
         raise HTTPException(status_code=404, detail="Session not found or deleted")
 
     return JSONResponse(content={"message": "Session renamed successfully"})
 
 
-# ✅ Get all messages of a session
+# ✅ Get one page of messages of a session (newest page by default)
 @app.get("/session/{session_id}")
-async def get_session_messages(session_id: str):
-    try:
-        session = sessions.find_one({"_id": ObjectId(session_id), "is_deleted": False})
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
+async def get_session_messages(
+    session_id: str,
+    limit: int = QueryParam(MESSAGE_PAGE_SIZE, ge=1, le=MESSAGE_PAGE_MAX),
+    before: str = None,
+    after: str = None,
+):
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either 'before' or 'after', not both")
 
-        messages = session.get("messages", [])
-        for msg in messages:
-            if "timestamp" in msg:
-                msg["timestamp"] = msg["timestamp"].isoformat()
+    session_obj_id = await get_active_session_id(session_id)
+    try:
+        page, has_more = await session_repo.get_messages(session_obj_id, limit, before=before, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        return JSONResponse(content={"messages": messages})
-    except InvalidId:
-        raise HTTPException(status_code=400, detail="Invalid session ID")
+    messages = [
+        {
+            "id": encode_cursor(msg),
+            "role": msg["role"],
+            "text": msg["text"],
+            "timestamp": msg["timestamp"].isoformat() if "timestamp" in msg else None,
+        }
+        for msg in page
+    ]
+    older_exist = has_more if not after else bool(page)
+    return JSONResponse(content={
+        "messages": messages,
+        "next_before": messages[0]["id"] if messages and older_exist else None,
+        "next_after": messages[-1]["id"] if messages else after,
+        "has_more": has_more,
+    })
 
-# ✅ Get all active sessions
+# ✅ Get active sessions, newest first; the next page's cursor is in X-Next-Cursor
 @app.get("/sessions")
-async def get_all_sessions():
+async def get_all_sessions(
+    limit: int = QueryParam(SESSION_PAGE_SIZE, ge=1, le=SESSION_PAGE_MAX),
+    after: str = None,
+):
+    try:
+        page, next_cursor = await session_repo.list_active(limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     sessions_list = []
-    for s in sessions.find({"is_deleted": False}):
+    for s in page:
         sessions_list.append({
             "id": str(s["_id"]),
             "name": s.get("session_name", "New Chat"),
             "created_at": s.get("created_at", datetime.utcnow()).strftime("%Y-%m-%d %H:%M:%S")
         })
-    return JSONResponse(content=sessions_list)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return JSONResponse(content=sessions_list, headers=headers)
 
-@app.post("/ask")
-async def ask(data: Query):
+async def get_active_session_id(session_id: str) -> ObjectId:
+    """Validate the ID and make sure the session exists and is not deleted."""
     try:
-        session_obj_id = ObjectId(data.session_id)
+        session_obj_id = ObjectId(session_id)
     except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid session ID")
 
-    session = sessions.find_one({"_id": session_obj_id, "is_deleted": False})
-    if not session:
+    if not await session_repo.exists(session_obj_id):
         raise HTTPException(status_code=404, detail="Session not found")
+    return session_obj_id
+
+
+async def save_messages(session_obj_id: ObjectId, user_text: str, bot_text: str):
+    user_msg = Message(role="user", text=user_text).dict()
+    bot_msg = Message(role="bot", text=bot_text).dict()
+
+    user_msg["timestamp"] = datetime.utcnow()
+    bot_msg["timestamp"] = datetime.utcnow()
+
+    # ✅ Both messages in one insert_many into chat_messages (one round trip)
+    with span("mongo_write"):
+        await session_repo.append_messages(session_obj_id, user_msg, bot_msg)
+
+
+@app.post("/ask")
+async def ask(data: Query):
+    with span("ask_total"):
+        return await answer_query(data)
+
+
+async def answer_query(data: Query):
+    with span("session_lookup"):
+        session_obj_id = await get_active_session_id(data.session_id)
 
     # ✅ Translate question → English for model understanding
-    translated_query = translate(data.query, target_lang="en")
+    with span("translate_query"):
+        translated_query = await run_in_threadpool(translate, data.query, target_lang="en")
     
-    # ✅ Get English answer from RAG
-    english_answer = get_rag_response(translated_query, session_id=data.session_id)
+    # ✅ Get English answer from the semantic cache, or from RAG on a miss
+    #    (blocking model / HTTP calls run in the threadpool, not on the event loop)
+    version = rag_chain.index_version
+    with span("answer_cache"):
+        english_answer, query_vector = await run_in_threadpool(answer_cache.get, translated_query, version=version)
+    if english_answer is None:
+        inc("rag_cache_misses_total", cache="answers")
 
-    # ✅ Translate bot's answer back to user's selected language
-    final_answer = (
-        translate(english_answer, target_lang=data.selected_lang)
-        if data.selected_lang and data.selected_lang != "en"
-        else english_answer
-    )
+        async def compute():
+            result = await run_in_threadpool(get_rag_response, translated_query, session_id=data.session_id)
+            answer_cache.put(translated_query, result, version=version, vector=query_vector)
+            return result
 
-    # ✅ Save messages
-    user_msg = Message(role="user", text=data.query).dict()
-    bot_msg = Message(role="bot", text=final_answer).dict()
+        # 👉 Keyed on the normalised question + index version; waiters share the result or the error
+        with span("rag"):
+            english_answer = await rag_flight.do((normalise_question(translated_query), version), compute)
+    else:
+        inc("rag_cache_hits_total", cache="answers")
 
-    user_msg["timestamp"] = datetime.utcnow()
-    bot_msg["timestamp"] = datetime.utcnow()
+    # ✅ Translate bot's answer back to user's selected language
+    with span("translate_answer"):
+        final_answer = (
+            await run_in_threadpool(translate, english_answer, target_lang=data.selected_lang, source_lang="en")
+            if data.selected_lang and data.selected_lang != "en"
+            else english_answer
+        )
 
-    sessions.update_one({"_id": session_obj_id}, {"$push": {"messages": user_msg}})
-    sessions.update_one({"_id": session_obj_id}, {"$push": {"messages": bot_msg}})
+    # ✅ Save messages
+    await save_messages(session_obj_id, data.query, final_answer)
 
     return JSONResponse(content={
         "answer": final_answer,
@@ -143,14 +248,121 @@ async def ask(data: Query):
     })
 
 
+# Sentence boundaries used to translate a streamed answer piece by piece
+SENTENCE_END = re.compile(r"(?<=[.!?:])\s+|\n+")
+
+
+def sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def translate_sentences(text: str, target_lang: str) -> str:
+    """Translate each sentence of `text`, keeping the original separators."""
+    parts = SENTENCE_END.split(text)
+    separators = [m.group(0) for m in SENTENCE_END.finditer(text)] + [""]
+    translated = translate_batch(parts, target_lang=target_lang, source_lang="en")
+    return "".join(t + sep for t, sep in zip(translated, separators))
+
+
+async def answer_stream(data: Query, session_obj_id: ObjectId):
+    target_lang = data.selected_lang if data.selected_lang and data.selected_lang != "en" else None
+    english_parts, final_parts, pending = [], [], ""
+
+    try:
+        translated_query = await run_in_threadpool(translate, data.query, target_lang="en")
+        version = rag_chain.index_version
+        cached, query_vector = await run_in_threadpool(answer_cache.get, translated_query, version=version)
+        inc("rag_cache_hits_total" if cached is not None else "rag_cache_misses_total", cache="answers")
+        tokens = [cached] if cached is not None else stream_rag_response(translated_query, data.session_id)
+
+        async for token in iterate_in_threadpool(iter(tokens)):
+            english_parts.append(token)
+            if target_lang is None:
+                final_parts.append(token)
+                yield sse({"token": token})
+                continue
+
+            # ✅ Hold tokens until a sentence is complete, then translate it
+            pending += token
+            boundaries = list(SENTENCE_END.finditer(pending))
+            if boundaries:
+                cut = boundaries[-1].end()
+                piece = await run_in_threadpool(translate_sentences, pending[:cut], target_lang)
+                pending = pending[cut:]
+                final_parts.append(piece)
+                yield sse({"token": piece})
+
+        if pending:
+            piece = await run_in_threadpool(translate_sentences, pending, target_lang)
+            final_parts.append(piece)
+            yield sse({"token": piece})
+    except Exception as e:
+        print(f"❌ Streaming error: {e}")
+        yield sse({"error": str(e)})
+        return
+
+    english_answer = "".join(english_parts)
+    final_answer = "".join(final_parts)
+    if cached is None:
+        answer_cache.put(translated_query, english_answer, version=version, vector=query_vector)
+
+    # ✅ Save the complete exchange once the stream has finished
+    await save_messages(session_obj_id, data.query, final_answer)
+    yield sse({"done": True, "answer": final_answer, "lang": data.selected_lang, "session_id": data.session_id})
+
+
+# ✅ Server-Sent Events version of /ask: tokens are sent as they are generated
+@app.post("/ask-stream")
+async def ask_stream(data: Query):
+    session_obj_id = await get_active_session_id(data.session_id)
+    return StreamingResponse(
+        answer_stream(data, session_obj_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ✅ Inspect / update RAG settings without a restart
+@app.get("/rag-config")
+async def get_rag_config():
+    return JSONResponse(content=pipeline.settings)
+
+@app.put("/rag-config")
+async def update_rag_config(body: RAGConfig):
+    try:
+        settings = pipeline.configure(**body.dict(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    answer_cache.clear()  # answers from the old model / settings are stale
+    return JSONResponse(content=settings)
+
+
+# ✅ Pick up added / changed / removed PDFs without a full rebuild
+@app.post("/reindex")
+def reindex_documents():
+    summary = reindex()
+    return JSONResponse(content=summary)
+
+# ✅ Prometheus scrape endpoint: per-stage p50/p95/p99 and counters
+@app.get("/metrics")
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+@app.get("/cache-stats")
+async def cache_stats():
+    return JSONResponse(content={
+        "answers": answer_cache.stats(),
+        "translations": translation_service.stats(),
+        "singleflight": rag_flight.stats(),
+    })
+
+
 # ✅ Speech-to-text conversion
 @app.post("/speech-to-text")
 async def convert_speech(file: UploadFile = File(...)):
-    audio_path = f"temp_{file.filename}"
-    with open(audio_path, "wb") as f:
-        f.write(await file.read())
+    audio_path = await save_upload(file)
     try:
-        text = speech_to_text(audio_path)
+        text = await run_in_threadpool(speech_to_text, audio_path)
     finally:
         os.remove(audio_path)
 
@@ -159,6 +371,10 @@ async def convert_speech(file: UploadFile = File(...)):
 # ✅ Detect language and auto-translate
 @app.post("/detect-and-translate")
 async def detect_and_translate(data: TextData):
-    detected_lang = detect_language(data.text)
-    corrected_text = translate(data.text, target_lang=detected_lang) if detected_lang != "en" else data.text
+    detected_lang = await run_in_threadpool(detect_language, data.text)
+    # 👉 "unknown" (too short / no letters) is not a translation target: return the text as-is
+    corrected_text = (
+        await run_in_threadpool(translate, data.text, target_lang=detected_lang, source_lang="auto")
+        if detected_lang not in ("en", "unknown") else data.text
+    )
     return JSONResponse(content={"corrected_text": corrected_text, "lang": detected_lang})
@@ -0,0 +1,46 @@
+"""
+One-off migration: move the embedded `messages` array of every session
+into the `chat_messages` collection (one document per message) and
+remove the array from the session document. Messages without a
+`timestamp` get the session's `created_at`, so keyset paging can order them.
+
+Run from the app/ folder:  python migrate_messages.py
+"""
+from pymongo import MongoClient, ASCENDING
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+client = MongoClient(os.getenv("MONGO_URI"))
+db = client["chatbot"]
+sessions = db["chat_sessions"]
+messages = db["chat_messages"]
+
+messages.create_index([("session_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)])
+
+moved = 0
+for session in sessions.find({"messages": {"$exists": True}}, {"messages": 1, "created_at": 1}):
+    fallback = session.get("created_at") or session["_id"].generation_time.replace(tzinfo=None)
+    docs = [
+        {"timestamp": fallback, **msg, "session_id": session["_id"]}
+        for msg in session.get("messages", [])
+    ]
+    if docs:
+        messages.insert_many(docs, ordered=True)
+        moved += len(docs)
+    sessions.update_one({"_id": session["_id"]}, {"$unset": {"messages": ""}})
+
+# ✅ Backfill messages moved by an earlier run of this script without a timestamp
+backfilled = 0
+for session_id in messages.distinct("session_id", {"timestamp": {"$exists": False}}):
+    session = sessions.find_one({"_id": session_id}, {"created_at": 1}) or {}
+    fallback = session.get("created_at") or session_id.generation_time.replace(tzinfo=None)
+    backfilled += messages.update_many(
+        {"session_id": session_id, "timestamp": {"$exists": False}},
+        {"$set": {"timestamp": fallback}}
+    ).modified_count
+
+print(f"✅ Moved {moved} messages into chat_messages.")
+if backfilled:
+    print(f"✅ Backfilled timestamps on {backfilled} messages.")
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class Query(BaseModel):
@@ -16,3 +17,13 @@ class TextData(BaseModel):
 
 class RenameRequest(BaseModel):
     new_name: str
+
+
+# Used to reconfigure the RAG pipeline at runtime
+class RAGConfig(BaseModel):
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+    k: Optional[int] = None
+    fetch_k: Optional[int] = None
+    nprobe: Optional[int] = None
+    ef_search: Optional[int] = None
@@ -1,106 +1,155 @@
-import os
-from langchain_community.document_loaders import PyPDFLoader # Used to load PDF documents
-from langchain_community.vectorstores import FAISS # FAISS for storing and retrieving embeddings
-from langchain_huggingface import HuggingFaceEmbeddings # HuggingFace model for generating embeddings
-from langchain.chains import RetrievalQA # High-level chain for question answering
+import threading
+import httpx
 from langchain_groq import ChatGroq # Groq's LLM integration
 from langchain.prompts import PromptTemplate # Used to create custom prompts
-from langchain.text_splitter import RecursiveCharacterTextSplitter # Splits large text into smaller chunks
 from bson import ObjectId
 from db import sessions
-from config import DATA_PATH, VECTORSTORE_DIR, VECTORSTORE_PATH, EMBEDDING_MODEL
+from indexer import embeddings, embed_documents_once, sync_index, load_manifest, save_index, scan_data_dir # FAISS index + manifest
+from utils.faiss_index import prepare_index
+from utils.mmr import MMRRetriever # Vectorised MMR over one batched candidate fetch
+from utils.metrics import span, inc
+from config import (
+    LLM_MODEL, LLM_TEMPERATURE, RETRIEVER_K, RETRIEVER_FETCH_K, IVF_NPROBE, HNSW_EF_SEARCH,
+    LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE,
+)
 
 
 
-# from langchain_community.document_loaders import (
-#     PyPDFLoader, 
-#     CSVLoader,       # ✅ for CSV files
-#     JSONLoader,      # ✅ for JSON files
-#     UnstructuredWordDocumentLoader  # ✅ for Word files
-# )
-
-
 # Cache FAISS index and memory
 vectorstore = None
+index_version = 0  # ✅ Bumped whenever the FAISS index changes
+_index_lock = threading.Lock()
+
+
+def reindex() -> dict:
+    """Re-scan DATA_PATH, update a copy of the index and swap it in."""
+    global vectorstore, index_version
+    with _index_lock:
+        # ✅ Requests keep searching the current index while the copy is updated
+        vs, manifest, summary = sync_index(vectorstore, load_manifest(), scan_data_dir(), in_place=False)
+        if any(summary.values()):
+            save_index(vs, manifest)
+            vectorstore = vs
+            pipeline.vectorstore = vs
+            pipeline.configure()
+            index_version += 1
+        return summary
 
-def embed_documents_once():
-    """
-    Load existing FAISS index if available, otherwise 
-    read PDFs, create embeddings, and save FAISS index.
-    """
-    if os.path.exists(VECTORSTORE_PATH):
-        print("✅ Using existing FAISS index...")
-        return FAISS.load_local(
-            VECTORSTORE_DIR,
-            HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL),
-            allow_dangerous_deserialization=True
-        )
-
-    print("🔄 Creating FAISS index for the first time...")
+# ✅ Initialize FAISS once
+vectorstore = embed_documents_once()
 
-    documents = []
-    for file in os.listdir(DATA_PATH):
-        if file.endswith(".pdf"):
-            loader = PyPDFLoader(os.path.join(DATA_PATH, file))
-            documents.extend(loader.load())
 
+PROMPT = PromptTemplate(
+    template=(
+        "You are a professional AI assistant.\n\n"
+        "### Context:\n{context}\n\n"
+        "### Question:\n{question}\n\n"
+        "### Instructions:\n"
+        "- Answer **only** from the context.\n"
+        "- Combine related facts into a single, concise, well-structured answer.\n"
+        "- Use short paragraphs, bullet points, and **bold** for key info.\n"
+        "- If answer is missing, reply exactly:\n"
+        "⚠️ Sorry, but the provided content does not contain information about the question you asked.\n\n"
+        "### Answer:"
+    ),
+    input_variables=["context", "question"]
+)
 
-        # elif file.endswith(".csv"):
-        #     loader = CSVLoader(file_path)
-        # elif file.endswith(".json"):
-        #     loader = JSONLoader(file_path, jq_schema='.')  
-        # elif file.endswith(".docx") or file.endswith(".doc"):
-        #     loader = UnstructuredWordDocumentLoader(file_path)
-        # else:
-        #     print(f"⚠️ Unsupported file type: {file}. Skipping...")
-        #     continue  
 
-    
-    splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=400)
-    texts = splitter.split_documents(documents)
+def record_tokens(message):
+    usage = getattr(message, "usage_metadata", None) or {}
+    inc("rag_llm_tokens_total", usage.get("input_tokens", 0), kind="prompt")
+    inc("rag_llm_tokens_total", usage.get("output_tokens", 0), kind="completion")
 
-    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
-    vs = FAISS.from_documents(texts, embeddings)
 
-    os.makedirs(VECTORSTORE_DIR, exist_ok=True)
-    vs.save_local(VECTORSTORE_DIR)
-    print("✅ FAISS index created and saved.")
+class RAGPipeline:
+    """
+    Long-lived retriever + LLM, built once at startup.
+    Requests only run retrieval and generation; `configure()` swaps
+    in a rebuilt pair without a restart.
+    """
 
-    return vs
+    def __init__(self, vs, model=LLM_MODEL, temperature=LLM_TEMPERATURE,
+                 k=RETRIEVER_K, fetch_k=RETRIEVER_FETCH_K,
+                 nprobe=IVF_NPROBE, ef_search=HNSW_EF_SEARCH):
+        self.vectorstore = vs
+        self.settings = {
+            "model": model, "temperature": temperature, "k": k, "fetch_k": fetch_k,
+            "nprobe": nprobe, "ef_search": ef_search,  # only used by IVF / HNSW indexes
+        }
+        # ✅ One pooled HTTP client shared by every ChatGroq instance we build
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            )
+        )
+        self._lock = threading.Lock()
+        self._build()
+
+    def _build(self):
+        s = self.settings
+        prepare_index(self.vectorstore.index, s["nprobe"], s["ef_search"])
+        retriever = MMRRetriever(  # ✅ Avoids redundant chunks
+            vectorstore=self.vectorstore,
+            embed_query=embeddings.embed_query,
+            k=s["k"],
+            fetch_k=s["fetch_k"],
+        )
+        llm = ChatGroq(model=s["model"], temperature=s["temperature"], http_client=self.http_client)
+        # ✅ Swap both together so a request never sees a half-built pipeline
+        self.retriever, self.llm = retriever, llm
+
+    def configure(self, **changes) -> dict:
+        """Update model / temperature / k / fetch_k / nprobe / ef_search and rebuild the pipeline."""
+        unknown = set(changes) - set(self.settings)
+        if unknown:
+            raise ValueError(f"Unknown RAG settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self.settings.update({key: val for key, val in changes.items() if val is not None})
+            if self.settings["fetch_k"] < self.settings["k"]:
+                self.settings["fetch_k"] = self.settings["k"]
+            self._build()
+            return dict(self.settings)
+
+    def run(self, query: str) -> str:
+        """RetrievalQA's "stuff" steps (retrieved chunks into PROMPT, one LLM call), timed per stage."""
+        retriever, llm = self.retriever, self.llm
+        with span("retrieval"):
+            docs = retriever.invoke(query)
+        context = "\n\n".join(doc.page_content for doc in docs)
+        with span("llm"):
+            message = llm.invoke(PROMPT.format(context=context, question=query))
+        record_tokens(message)
+        return message.content
+
+    def stream(self, query: str):
+        """Same retrieval + prompt as `run`, but yield LLM tokens as they arrive."""
+        retriever, llm = self.retriever, self.llm
+        with span("retrieval"):
+            docs = retriever.invoke(query)
+        context = "\n\n".join(doc.page_content for doc in docs)
+        with span("llm_stream"):
+            for chunk in llm.stream(PROMPT.format(context=context, question=query)):
+                if chunk.content:
+                    inc("rag_llm_stream_chunks_total")
+                    yield chunk.content
+
+    def close(self):
+        self.http_client.close()
+
+
+# ✅ Build the pipeline once per process
+pipeline = RAGPipeline(vectorstore)
 
-# ✅ Initialize FAISS once
-vectorstore = embed_documents_once()
 
 def get_rag_response(query: str, session_id: str) -> str:
     """Retrieve context-aware answer using FAISS + Groq LLM."""
     print(f"📌 Generating RAG response for session: {session_id}")
+    return pipeline.run(query)
+
 
-    retriever = vectorstore.as_retriever(
-        search_type="mmr",  # ✅ Avoids redundant chunks
-        search_kwargs={"k": 15, "fetch_k": 20}
-    )
-
-    prompt = PromptTemplate(
-        template=(
-            "You are a professional AI assistant.\n\n"
-            "### Context:\n{context}\n\n"
-            "### Question:\n{question}\n\n"
-            "### Instructions:\n"
-            "- Answer **only** from the context.\n"
-            "- Combine related facts into a single, concise, well-structured answer.\n"
-            "- Use short paragraphs, bullet points, and **bold** for key info.\n"
-            "- If answer is missing, reply exactly:\n"
-            "⚠️ Sorry, but the provided content does not contain information about the question you asked.\n\n"
-            "### Answer:"
-        ),
-        input_variables=["context", "question"]
-    )
-
-
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=ChatGroq(model="llama3-70b-8192", temperature=0),
-        retriever=retriever,
-        chain_type_kwargs={"prompt": prompt}
-    )
-
-    return qa_chain.run(query)
+def stream_rag_response(query: str, session_id: str):
+    """Token generator version of `get_rag_response`."""
+    print(f"📌 Streaming RAG response for session: {session_id}")
+    yield from pipeline.stream(query)
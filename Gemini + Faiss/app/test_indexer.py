@@ -0,0 +1,53 @@
+"""
+Run from the app/ folder:  python -m pytest test_indexer.py
+
+The embedding model is replaced by a small deterministic fake, so no model
+is downloaded; FAISS and LangChain must be installed.
+"""
+import sys
+import types
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_community.vectorstores")
+
+
+class FakeEmbeddings:
+    model_name = "fake"
+
+    def __init__(self, **kwargs):
+        pass
+
+    def embed_query(self, text):
+        return [float(len(text) % 7), 1.0, 0.0, 0.5]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+
+@pytest.fixture
+def indexer(tmp_path, monkeypatch):
+    # Paths in config.py are relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    monkeypatch.setitem(sys.modules, "langchain_huggingface",
+                        types.SimpleNamespace(HuggingFaceEmbeddings=FakeEmbeddings))
+    for name in ("config", "indexer"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    import indexer
+    return indexer
+
+
+def test_empty_data_dir_gives_an_empty_index(indexer):
+    vs = indexer.embed_documents_once(workers=1)
+    assert vs is not None
+    assert vs.index.ntotal == 0
+
+
+def test_rebuild_with_empty_data_dir_saves_an_empty_index(indexer, monkeypatch):
+    indexer.save_index(indexer.embed_documents_once(workers=1), {})
+    # A different INDEX_TYPE than the saved one forces the rebuild path
+    monkeypatch.setattr(indexer, "INDEX_TYPE", "ivf_flat")
+    vs = indexer.embed_documents_once(workers=1)
+    assert vs.index.ntotal == 0
+    assert indexer.load_index_meta()["index_type"] == "ivf_flat"
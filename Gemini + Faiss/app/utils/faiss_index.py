@@ -0,0 +1,182 @@
+import math
+import tempfile
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+# flat       exact search (what FAISS.from_documents builds)
+# ivf_flat   inverted lists, full vectors
+# ivf_sq8    inverted lists, int8 scalar-quantised vectors (4x smaller)
+# ivf_pq     inverted lists, product-quantised vectors (pq_m bytes per vector)
+# hnsw       graph index, full vectors
+# hnsw_sq8   graph index, int8 scalar-quantised vectors
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_sq8", "ivf_pq", "hnsw", "hnsw_sq8")
+# FAISS class behind each type, most specific first (read_index / clone_index return these)
+INDEX_CLASSES = (
+    ("flat", "IndexFlat"), ("hnsw_sq8", "IndexHNSWSQ"), ("hnsw", "IndexHNSWFlat"),
+    ("ivf_sq8", "IndexIVFScalarQuantizer"), ("ivf_pq", "IndexIVFPQ"), ("ivf_flat", "IndexIVFFlat"),
+)
+ADD_BATCH = 4096  # vectors per add_embeddings call when filling a trained index
+
+
+def choose_nlist(n_vectors: int, nlist: int = 0) -> int:
+    """nlist from config, or ~4*sqrt(n); capped so every list gets ~39 training points."""
+    wanted = nlist or int(4 * math.sqrt(n_vectors))
+    return max(1, min(wanted, n_vectors // 39))
+
+
+def min_training_points(index_type: str, params: dict) -> int:
+    if index_type == "ivf_pq":
+        return max(39, 2 ** params["pq_nbits"])
+    if index_type.startswith("ivf"):
+        return 39
+    return 1
+
+
+def new_index(index_type: str, dim: int, n_train: int, params: dict):
+    """Empty (untrained) FAISS index of the requested type, L2 metric like LangChain's default."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown INDEX_TYPE '{index_type}', expected one of {INDEX_TYPES}")
+
+    if n_train < min_training_points(index_type, params):
+        print(f"⚠️ Only {n_train} vectors, too few to train '{index_type}'; using a flat index")
+        index_type = "flat"
+
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["hnsw_m"])
+    elif index_type == "hnsw_sq8":
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, params["hnsw_m"])
+    if index_type.startswith("hnsw"):
+        index.hnsw.efConstruction = params["hnsw_ef_construction"]
+        return index
+
+    nlist = choose_nlist(n_train, params["ivf_nlist"])
+    quantizer = faiss.IndexFlatL2(dim)
+    if index_type == "ivf_flat":
+        return faiss.IndexIVFFlat(quantizer, dim, nlist)
+    if index_type == "ivf_sq8":
+        return faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, faiss.ScalarQuantizer.QT_8bit)
+
+    pq_m = params["pq_m"]
+    while dim % pq_m:  # PQ needs dim divisible by the number of sub-quantizers
+        pq_m -= 1
+    return faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, params["pq_nbits"])
+
+
+def index_type_of(index) -> str:
+    """The INDEX_TYPES name of an index that was actually built (e.g. 'flat' after a fallback)."""
+    for name, cls in INDEX_CLASSES:
+        if isinstance(index, getattr(faiss, cls)):
+            return name
+    return type(index).__name__
+
+
+def prepare_index(index, nprobe: int, ef_search: int):
+    """Apply query-time settings; IVF indexes also get a direct map so MMR can reconstruct vectors."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+        if ivf.direct_map.type == faiss.DirectMap.NoMap:
+            ivf.make_direct_map()
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+    return index
+
+
+def empty_vectorstore(embeddings) -> FAISS:
+    """Flat store with no vectors, for a data folder without documents."""
+    dim = len(embeddings.embed_query("dimension probe"))
+    return FAISS(embeddings, faiss.IndexFlatL2(dim), InMemoryDocstore(), {})
+
+
+def copy_vectorstore(vs: FAISS) -> FAISS:
+    """Independent copy of a LangChain FAISS store, so it can be changed while the original serves searches."""
+    return FAISS(
+        vs.embedding_function,
+        faiss.clone_index(vs.index),
+        InMemoryDocstore(dict(vs.docstore._dict)),
+        dict(vs.index_to_docstore_id),
+    )
+
+
+class IndexBuilder:
+    """
+    Streams (text, vector, metadata, id) batches into a FAISS vectorstore.
+    Index types that need training (IVF) keep a uniform random sample of
+    `train_sample` vectors over the whole stream (reservoir sampling) and
+    spill every vector to a temporary file; `finish()` trains on the sample,
+    so late documents shape the centroids as much as early ones, and then
+    adds everything. Other types are filled as batches arrive.
+    """
+
+    def __init__(self, embeddings, vs, index_type: str, params: dict, train_sample: int, seed: int = 0):
+        self.embeddings = embeddings
+        self.vs = vs
+        self.index_type = index_type
+        self.params = params
+        self.train_sample = train_sample
+        self.needs_training = vs is None and min_training_points(index_type, params) > 1
+        self.rng = np.random.default_rng(seed)
+        self.sample = None  # (train_sample, dim) reservoir
+        self.seen = 0
+        self.spill = None
+        self.pending = ([], [], [])  # texts, metadatas, ids in spill-file order
+
+    def add(self, texts, vectors, metadatas, ids):
+        if not self.needs_training:
+            if self.vs is None:
+                index = new_index(self.index_type, len(vectors[0]), len(vectors), self.params)
+                prepare_index(index, self.params["nprobe"], self.params["ef_search"])
+                self.vs = FAISS(self.embeddings, index, InMemoryDocstore(), {})
+            self.vs.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+            return
+
+        matrix = np.asarray(vectors, dtype="float32")
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile()
+            self.sample = np.empty((self.train_sample, matrix.shape[1]), dtype="float32")
+        self.spill.write(matrix.tobytes())
+        for pending, values in zip(self.pending, (texts, metadatas, ids)):
+            pending.extend(values)
+        self._reservoir(matrix)
+
+    def _reservoir(self, matrix):
+        """Algorithm R: after n vectors, each one is in the sample with probability train_sample / n."""
+        for row in matrix:
+            if self.seen < self.train_sample:
+                self.sample[self.seen] = row
+            else:
+                slot = self.rng.integers(0, self.seen + 1)
+                if slot < self.train_sample:
+                    self.sample[slot] = row
+            self.seen += 1
+
+    def _create(self):
+        sample = self.sample[:min(self.seen, self.train_sample)]
+        dim = sample.shape[1]
+        index = new_index(self.index_type, dim, len(sample), self.params)
+        if not index.is_trained:
+            print(f"🧠 Training {self.index_type} index on {len(sample)} of {self.seen} vectors...")
+            index.train(sample)
+        prepare_index(index, self.params["nprobe"], self.params["ef_search"])
+        self.vs = FAISS(self.embeddings, index, InMemoryDocstore(), {})
+
+        texts, metadatas, ids = self.pending
+        self.spill.seek(0)
+        for start in range(0, self.seen, ADD_BATCH):
+            end = min(start + ADD_BATCH, self.seen)
+            block = np.frombuffer(self.spill.read((end - start) * dim * 4), dtype="float32").reshape(-1, dim)
+            self.vs.add_embeddings(
+                list(zip(texts[start:end], block)), metadatas=metadatas[start:end], ids=ids[start:end]
+            )
+        self.spill.close()
+        self.spill, self.sample, self.pending = None, None, ([], [], [])
+
+    def finish(self):
+        if self.spill is not None:
+            self._create()
+        return self.vs
@@ -0,0 +1,110 @@
+"""
+Vectorised maximal marginal relevance over a FAISS index.
+
+Candidates for all queries are fetched with one `index.search` call and
+their vectors with one `reconstruct_batch` call into a contiguous matrix.
+Selection then runs as NumPy matrix operations: one step per selected
+document, no Python loop over candidates. The picks are the same as
+LangChain's `maximal_marginal_relevance`: cosine similarity, first index
+wins ties.
+"""
+from typing import Any, List
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from utils.metrics import span, inc
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = matrix / norms
+    return np.nan_to_num(out, nan=0.0, posinf=0.0, neginf=0.0)  # zero vectors -> similarity 0
+
+
+def mmr_select(query_vectors: np.ndarray, candidates: np.ndarray, valid: np.ndarray,
+               k: int, lambda_mult: float = 0.5) -> np.ndarray:
+    """
+    query_vectors (m, d), candidates (m, n, d), valid (m, n) bool.
+    Returns (m, k) candidate positions in pick order; -1 where fewer than k are valid.
+    """
+    m, n, _ = candidates.shape
+    q = _normalise(query_vectors.astype("float32"))
+    c = _normalise(candidates.astype("float32"))
+    sim_query = np.einsum("md,mnd->mn", q, c)  # (m, n)
+    gram = np.einsum("mnd,mjd->mnj", c, c)  # (m, n, n) candidate-candidate similarity
+
+    rows = np.arange(m)
+    available = valid.copy()
+    max_sim_selected = np.full((m, n), -np.inf, dtype="float32")
+    picks = np.full((m, min(k, n)), -1, dtype="int64")
+
+    for step in range(picks.shape[1]):
+        if step == 0:
+            score = sim_query.copy()
+        else:
+            score = lambda_mult * sim_query - (1 - lambda_mult) * max_sim_selected
+        score[~available] = -np.inf
+        best = np.argmax(score, axis=1)
+        has_pick = available[rows, best]
+        picks[has_pick, step] = best[has_pick]
+        available[rows[has_pick], best[has_pick]] = False
+        max_sim_selected[has_pick] = np.maximum(max_sim_selected[has_pick], gram[rows[has_pick], best[has_pick]])
+    return picks
+
+
+def mmr_search_batch(vs, query_vectors, k: int, fetch_k: int, lambda_mult: float = 0.5) -> List[List[Document]]:
+    """MMR for many queries at once against a LangChain FAISS vectorstore."""
+    queries = np.asarray(query_vectors, dtype="float32").reshape(len(query_vectors), -1)
+    if vs.index.ntotal == 0:
+        return [[] for _ in range(len(queries))]  # empty index (no documents yet)
+    fetch_k = max(1, min(fetch_k, vs.index.ntotal))
+    with span("faiss_search"):
+        _, ids = vs.index.search(queries, fetch_k)  # (m, fetch_k), -1 for missing
+
+    with span("mmr"):
+        results = _rerank(vs, queries, ids, k, fetch_k, lambda_mult)
+    inc("rag_chunks_retrieved_total", sum(len(docs) for docs in results))
+    return results
+
+
+def _rerank(vs, queries, ids, k, fetch_k, lambda_mult):
+    valid = ids != -1
+    if not valid.any():
+        return [[] for _ in range(len(queries))]  # ✅ Nothing to reconstruct
+    flat_ids = np.where(valid, ids, 0).ravel()
+    unique_ids, inverse = np.unique(flat_ids, return_inverse=True)
+    vectors = vs.index.reconstruct_batch(unique_ids)  # one contiguous (u, d) block
+    candidates = vectors[inverse].reshape(len(queries), fetch_k, -1)
+
+    picks = mmr_select(queries, candidates, valid, k, lambda_mult)
+    results = []
+    for row_ids, row_picks in zip(ids, picks):
+        docs = []
+        for pick in row_picks:
+            if pick == -1:
+                break
+            docs.append(vs.docstore.search(vs.index_to_docstore_id[int(row_ids[pick])]))
+        results.append(docs)
+    return results
+
+
+class MMRRetriever(BaseRetriever):
+    """Drop-in for `as_retriever(search_type="mmr")` that uses `mmr_search_batch`."""
+
+    vectorstore: Any
+    embed_query: Any
+    k: int = 4
+    fetch_k: int = 20
+    lambda_mult: float = 0.5
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        with span("embed"):
+            vector = self.embed_query(query)
+        return mmr_search_batch(self.vectorstore, [vector], self.k, self.fetch_k, self.lambda_mult)[0]
+
+    def search_batch(self, queries: List[str]) -> List[List[Document]]:
+        with span("embed"):
+            vectors = [self.embed_query(q) for q in queries]
+        return mmr_search_batch(self.vectorstore, vectors, self.k, self.fetch_k, self.lambda_mult)
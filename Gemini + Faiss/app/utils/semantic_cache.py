@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+class SemanticCache:
+    """
+    LRU + TTL cache of English answers keyed on the query embedding.
+    A lookup hits when a cached query's cosine similarity is >= threshold.
+    Entries belong to one index version (an increasing number); a newer
+    version empties the cache, and calls carrying an older one are ignored.
+    """
+
+    def __init__(self, embed_fn, threshold=0.95, max_entries=1000, ttl=3600):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # query -> (vector, answer, stored_at)
+        self._lock = threading.Lock()
+
+    def embed(self, query: str) -> np.ndarray:
+        vec = np.asarray(self.embed_fn(query), dtype="float32")
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _is_stale(self, version) -> bool:
+        return self.version is not None and version is not None and version < self.version
+
+    def _check_version(self, version):
+        """Only ever moves forward; callers skip stale versions first."""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def _evict_expired(self, now):
+        expired = [q for q, (_, _, stored_at) in self._entries.items() if now - stored_at > self.ttl]
+        for q in expired:
+            del self._entries[q]
+
+    def get(self, query: str, version=None, vector=None):
+        """Return (answer, vector); answer is None on a miss."""
+        if vector is None:
+            vector = self.embed(query)
+        with self._lock:
+            if self._is_stale(version):
+                self.misses += 1
+                return None, vector  # ✅ A request from before a reindex must not wipe the current cache
+            self._check_version(version)
+            self._evict_expired(time.time())
+            if self._entries:
+                keys = list(self._entries)
+                matrix = np.stack([self._entries[q][0] for q in keys])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.hits += 1
+                    return self._entries[keys[best]][1], vector
+            self.misses += 1
+            return None, vector
+
+    def put(self, query: str, answer: str, version=None, vector=None):
+        if vector is None:
+            vector = self.embed(query)
+        with self._lock:
+            if self._is_stale(version):
+                return  # ✅ Answered from an index that has since changed: don't cache it or reset the cache
+            self._check_version(version)
+            self._entries[query] = (vector, answer, time.time())
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,95 @@
+"""
+Single-flight request coalescing: concurrent calls with the same key share
+one in-flight computation. The first caller (the leader) runs it; callers
+that arrive while it is running wait for the same result, or the same
+exception. Nothing is kept once the call finishes, so this complements a
+result cache rather than replacing it.
+"""
+import re
+import asyncio
+import threading
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalise_question(text: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the answer."""
+    return _SPACES.sub(" ", text).strip().rstrip("?!. ").lower()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread version, for sync handlers running in the threadpool."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class AsyncSingleFlight:
+    """Event-loop version: `fn` is a zero-argument coroutine function."""
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _finished(self, key, future):
+        self._calls.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # mark retrieved even if every waiter went away
+
+    async def do(self, key, fn):
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._finished(key, f))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        # ✅ shield: one client disconnecting must not cancel the others' answer
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
@@ -1,8 +1,147 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from deep_translator import GoogleTranslator
 from langdetect import detect
+from langdetect.lang_detect_exception import LangDetectException
+from config import TRANSLATION_BACKEND, TRANSLATION_CACHE_SIZE
 
-def translate(text: str, target_lang: str = "en") -> str:
-    return GoogleTranslator(target=target_lang).translate(text)
+
+class GoogleBackend:
+    """
+    deep_translator's GoogleTranslator, one instance per (source, target) pair
+    per thread: translate() stores the request text on the instance, so an
+    instance must never be shared between concurrent threadpool calls.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _get(self, source: str, target: str) -> GoogleTranslator:
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        key = (source, target)
+        if key not in translators:
+            translators[key] = GoogleTranslator(source=source, target=target)
+        return translators[key]
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        return self._get(source, target).translate(text)
+
+    def translate_batch(self, texts: list, source: str, target: str) -> list:
+        return self._get(source, target).translate_batch(texts)
+
+
+class IdentityBackend:
+    """Offline stand-in for tests / local runs: returns the text unchanged."""
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        return text
+
+    def translate_batch(self, texts: list, source: str, target: str) -> list:
+        return list(texts)
+
+
+BACKENDS = {"google": GoogleBackend, "identity": IdentityBackend}
+
+
+class TranslationService:
+    """
+    Translation with language detection first (same-language calls are skipped),
+    a bounded LRU cache keyed on (text hash, source, target) and batch support.
+    """
+
+    def __init__(self, backend, cache_size=5000):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            return None
+
+    def _cache_put(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def detect(self, text: str) -> str:
+        key = (self._hash(text), "detect", "")
+        lang = self._cache_get(key)
+        if lang is None:
+            try:
+                lang = detect(text)
+            except LangDetectException:
+                lang = "unknown"
+            self._cache_put(key, lang)
+        return lang
+
+    def translate(self, text: str, target: str = "en", source: str = None) -> str:
+        if not text or not text.strip():
+            return text
+        if (source or self.detect(text)) == target:
+            return text
+
+        source = source or "auto"
+        key = (self._hash(text), source, target)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        result = self.backend.translate(text, source, target)
+        self._cache_put(key, result)
+        return result
+
+    def translate_many(self, texts: list, target: str = "en", source: str = None) -> list:
+        """Translate many strings; cached / same-language ones skip the backend."""
+        results = list(texts)
+        pending = {}  # text -> indexes still to translate
+        for i, text in enumerate(texts):
+            if not text or not text.strip() or (source or self.detect(text)) == target:
+                continue
+            cached = self._cache_get((self._hash(text), source or "auto", target))
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+
+        if pending:
+            unique = list(pending)
+            translated = self.backend.translate_batch(unique, source or "auto", target)
+            for text, result in zip(unique, translated):
+                self._cache_put((self._hash(text), source or "auto", target), result)
+                for i in pending[text]:
+                    results[i] = result
+        return results
+
+    def stats(self) -> dict:
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+# ✅ One shared service per process
+service = TranslationService(BACKENDS[TRANSLATION_BACKEND](), cache_size=TRANSLATION_CACHE_SIZE)
+
+
+def translate(text: str, target_lang: str = "en", source_lang: str = None) -> str:
+    return service.translate(text, target=target_lang, source=source_lang)
+
+def translate_batch(texts: list, target_lang: str = "en", source_lang: str = None) -> list:
+    return service.translate_many(texts, target=target_lang, source=source_lang)
 
 def detect_language(text: str) -> str:
-    return detect(text)
+    return service.detect(text)
@@ -0,0 +1,18 @@
+import os
+import shutil
+import tempfile
+from starlette.concurrency import run_in_threadpool
+from config import UPLOAD_CHUNK_SIZE
+
+
+def _copy_to_temp(src, suffix: str) -> str:
+    # ✅ Unique name per request; copied in fixed-size chunks, never fully in memory
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix="upload_") as dst:
+        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+        return dst.name
+
+
+async def save_upload(file) -> str:
+    """Streams an UploadFile (already spooled by Starlette) to a unique temp file."""
+    suffix = os.path.splitext(file.filename or "")[1]
+    return await run_in_threadpool(_copy_to_temp, file.file, suffix)
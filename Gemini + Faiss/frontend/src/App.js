@@ -13,14 +13,28 @@ function App() {
   const [recording, setRecording] = useState(false);
   const [speechLang, setSpeechLang] = useState("en-US");
   const [sessions, setSessions] = useState([]);
+  const [sessionsCursor, setSessionsCursor] = useState(null);
   const [selectedSessionId, setSelectedSessionId] = useState(null);
+  const [olderCursor, setOlderCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const recognitionRef = useRef(null);
   const chatBoxRef = useRef(null);
+  const keepScrollRef = useRef(null);
+  const sessionRef = useRef(null);
 
-  // Auto-scroll chat
   useEffect(() => {
-    if (chatBoxRef.current) {
-      chatBoxRef.current.scrollTop = chatBoxRef.current.scrollHeight;
+    sessionRef.current = selectedSessionId;
+  }, [selectedSessionId]);
+
+  // Auto-scroll chat (or keep the reader in place after older messages are prepended)
+  useEffect(() => {
+    const box = chatBoxRef.current;
+    if (!box) return;
+    if (keepScrollRef.current !== null) {
+      box.scrollTop = box.scrollHeight - keepScrollRef.current;
+      keepScrollRef.current = null;
+    } else {
+      box.scrollTop = box.scrollHeight;
     }
   }, [messages]);
 
@@ -34,6 +48,7 @@ function App() {
       const res = await axios.get(`${API_URL}/sessions`);
       const filtered = res.data.filter((s) => !s.is_deleted);
       setSessions(filtered);
+      setSessionsCursor(res.headers["x-next-cursor"] || null);
 
       if (filtered.length > 0 && !selectedSessionId) {
         setSelectedSessionId(filtered[0].id);
@@ -43,11 +58,27 @@ function App() {
       console.error("Failed to load sessions:", err);
       // Handle case when backend is not available
       setSessions([]);
+      setSessionsCursor(null);
       setSelectedSessionId(null);
       setMessages([]);
     }
   };
 
+  // Next page of the sidebar, cursor from the X-Next-Cursor header
+  const loadMoreSessions = async () => {
+    if (!sessionsCursor) return;
+    try {
+      const res = await axios.get(`${API_URL}/sessions`, { params: { after: sessionsCursor } });
+      setSessions((prev) => {
+        const seen = new Set(prev.map((s) => s.id));
+        return [...prev, ...res.data.filter((s) => !seen.has(s.id))];
+      });
+      setSessionsCursor(res.headers["x-next-cursor"] || null);
+    } catch (err) {
+      console.error("Failed to load more sessions:", err);
+    }
+  };
+
   const createSession = async () => {
     try {
       const res = await axios.post(`${API_URL}/create-session`);
@@ -55,6 +86,7 @@ function App() {
       setSelectedSessionId(newSessionId);
       fetchSessions();
       setMessages([]);
+      setOlderCursor(null);
     } catch (err) {
       console.error("Failed to create session:", err);
       alert("Unable to create session. Please ensure the backend server is running.");
@@ -66,9 +98,33 @@ function App() {
       const res = await axios.get(`${API_URL}/session/${sessionId}`);
       setSelectedSessionId(sessionId);
       setMessages(res.data.messages || []);
+      setOlderCursor(res.data.next_before);
     } catch (err) {
       console.error("Failed to load session messages:", err);
       setMessages([]);
+      setOlderCursor(null);
+    }
+  };
+
+  // Fetch the page before the oldest loaded message
+  const loadOlderMessages = async () => {
+    if (!olderCursor || !selectedSessionId || loadingOlder) return;
+    const sessionId = selectedSessionId;
+    setLoadingOlder(true);
+    try {
+      const res = await axios.get(`${API_URL}/session/${sessionId}`, {
+        params: { before: olderCursor },
+      });
+      if (sessionId !== sessionRef.current) return;  // user switched chats meanwhile
+      if (chatBoxRef.current) {
+        keepScrollRef.current = chatBoxRef.current.scrollHeight - chatBoxRef.current.scrollTop;
+      }
+      setMessages((prev) => [...(res.data.messages || []), ...prev]);
+      setOlderCursor(res.data.next_before);
+    } catch (err) {
+      console.error("Failed to load older messages:", err);
+    } finally {
+      setLoadingOlder(false);
     }
   };
 
@@ -79,6 +135,7 @@ function App() {
 
       if (selectedSessionId === sessionId) {
         setMessages([]);
+        setOlderCursor(null);
         setSelectedSessionId(null);
 
         const remaining = sessions.filter(s => s.id !== sessionId);
@@ -139,34 +196,65 @@ function App() {
   const sendMessage = async () => {
     if (!query.trim() || !selectedSessionId) return;
     setLoading(true);
+    const question = query;
+    setQuery("");
+    setMessages((prev) => [
+      ...prev,
+      { role: "user", text: question },
+      { role: "bot", text: "" },
+    ]);
+
+    // Replace the text of the last (bot) message while tokens stream in
+    const updateBotMessage = (text, outOfContext = false) =>
+      setMessages((prev) => [...prev.slice(0, -1), { role: "bot", text, outOfContext }]);
+
     try {
-      const res = await axios.post(`${API_URL}/ask`, {
-        query,
-        selected_lang:
-          speechLang.startsWith("hi")
-            ? "hi"
-            : speechLang.startsWith("gu")
-            ? "gu"
-            : "en",
-        session_id: selectedSessionId,
+      const res = await fetch(`${API_URL}/ask-stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          query: question,
+          selected_lang:
+            speechLang.startsWith("hi")
+              ? "hi"
+              : speechLang.startsWith("gu")
+              ? "gu"
+              : "en",
+          session_id: selectedSessionId,
+        }),
       });
-      const answer = res.data.answer;
-      const isOutOfContext = /cannot answer|out of context|no information/i.test(answer);
+      if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
 
-      setMessages((prev) => [
-        ...prev,
-        { role: "user", text: query },
-        { role: "bot", text: answer, outOfContext: isOutOfContext },
-      ]);
-      setQuery("");
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let answer = "";
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Server-Sent Events are separated by a blank line
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const event of events) {
+          if (!event.startsWith("data: ")) continue;
+          const payload = JSON.parse(event.slice(6));
+          if (payload.error) throw new Error(payload.error);
+          if (payload.token) {
+            answer += payload.token;
+            updateBotMessage(answer);
+          }
+          if (payload.done) {
+            answer = payload.answer;
+            updateBotMessage(answer, /cannot answer|out of context|no information/i.test(answer));
+          }
+        }
+      }
     } catch (err) {
       console.error("Error sending message:", err);
-      setMessages((prev) => [
-        ...prev,
-        { role: "user", text: query },
-        { role: "bot", text: "Sorry, I cannot respond right now. Please ensure the backend server is running.", outOfContext: true },
-      ]);
-      setQuery("");
+      updateBotMessage("Sorry, I cannot respond right now. Please ensure the backend server is running.", true);
     } finally {
       setLoading(false);
     }
@@ -212,6 +300,11 @@ function App() {
               </div>
             </div>
           ))}
+          {sessionsCursor && (
+            <button className="load-more-btn" onClick={loadMoreSessions}>
+              Load more
+            </button>
+          )}
         </div>
       </div>
 
@@ -253,8 +346,16 @@ function App() {
               </div>
             )}
             
+            {olderCursor && (
+              <div className="load-older">
+                <button className="load-older-btn" onClick={loadOlderMessages} disabled={loadingOlder}>
+                  {loadingOlder ? "Loading..." : "Load older messages"}
+                </button>
+              </div>
+            )}
+
             {messages.map((msg, i) => (
-              <div key={i} className={`message-wrapper ${msg.role}`}>
+              <div key={msg.id || `new-${i}`} className={`message-wrapper ${msg.role}`}>
                 <div className={`message ${msg.role} ${msg.outOfContext ? "out-of-context" : ""}`}>
                   <div className="message-content">
                     <ReactMarkdown>{msg.text}</ReactMarkdown>
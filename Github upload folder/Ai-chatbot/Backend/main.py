@@ -5,6 +5,8 @@ from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings  
 from langchain_ollama import OllamaLLM
 from langchain.chains import RetrievalQA
+from mmap_store import load_mmap, is_current
+import os
 
 
 
@@ -20,9 +22,13 @@ app.add_middleware(
 )
 
 
-# Load vector store
+# Load vector store: memory-mapped copy shared by all workers if ingest.py exported it
+# and the export is not older than the pickled store
 embedding = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-db_faiss = FAISS.load_local("vectorstore", embedding, allow_dangerous_deserialization=True)
+if is_current("vectorstore_mmap", "vectorstore"):
+    db_faiss = load_mmap("vectorstore_mmap", embedding)
+else:
+    db_faiss = FAISS.load_local("vectorstore", embedding, allow_dangerous_deserialization=True)
 
 
 retriever = db_faiss.as_retriever(search_kwargs={"k": 3})
@@ -0,0 +1,118 @@
+"""
+Read-only, memory-mapped FAISS vectorstore that several uvicorn workers can share.
+
+`export_mmap()` converts a normal `save_local` folder (index.faiss + pickled
+index.pkl) into:
+    index.faiss   - the FAISS index, opened with IO_FLAG_MMAP
+    docs.bin      - UTF-8 JSON record per chunk, in FAISS position order
+    offsets.npy   - int64 start offsets into docs.bin (n + 1 entries)
+
+`load_mmap()` opens those files read-only with mmap. Nothing is unpickled,
+and the OS page cache holds one copy of the pages for every worker on the host.
+
+The export is written to a sibling temp folder and renamed into place, so
+running workers keep their mapping of the old (unlinked) files and a worker
+starting mid-export never pairs a new index with old offsets.
+"""
+import json
+import mmap
+import os
+import shutil
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+
+# IO_FLAG_MMAP alone only maps IVF inverted lists; flat indexes (what FAISS.from_documents
+# builds) need IO_FLAG_MMAP_IFC, which faiss added in 1.10 (pinned in requirements.txt)
+if not hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+    print(f"⚠️ faiss {faiss.__version__} has no IO_FLAG_MMAP_IFC: flat indexes are read into "
+          "each worker's private memory instead of being shared. Upgrade to faiss-cpu>=1.10.")
+MMAP_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+
+
+class MmapDocstore(Docstore):
+    """Docstore addressed by FAISS position, backed by a memory-mapped file."""
+
+    def __init__(self, folder: str):
+        self.offsets = np.load(os.path.join(folder, "offsets.npy"), mmap_mode="r")
+        with open(os.path.join(folder, "docs.bin"), "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(f.name) else b""
+
+    def search(self, search: int):
+        position = int(search)
+        if not 0 <= position < len(self.offsets) - 1:
+            return f"ID {search} not found."
+        record = json.loads(self.data[int(self.offsets[position]):int(self.offsets[position + 1])])
+        return Document(page_content=record["page_content"], metadata=record["metadata"])
+
+
+class PositionIds:
+    """Stand-in for FAISS.index_to_docstore_id: the docstore ID is the position itself."""
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def __getitem__(self, position: int) -> int:
+        if not 0 <= position < self.size:
+            raise KeyError(position)
+        return position
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, position):
+        return isinstance(position, int) and 0 <= position < self.size
+
+
+def is_current(mmap_dir: str, src_dir: str) -> bool:
+    """True when an export exists and is not older than the `save_local` folder it came from."""
+    marker = os.path.join(mmap_dir, "offsets.npy")
+    if not os.path.exists(marker):
+        return False
+    sources = [os.path.join(src_dir, f) for f in ("index.faiss", "index.pkl")]
+    newest = max((os.path.getmtime(p) for p in sources if os.path.exists(p)), default=0)
+    return os.path.getmtime(marker) >= newest
+
+
+def export_mmap(src_dir: str, dst_dir: str, embedding):
+    """Write the mmap-friendly copy of a `save_local` vectorstore, swapped in atomically."""
+    vs = FAISS.load_local(src_dir, embedding, allow_dangerous_deserialization=True)
+    dst_dir = os.path.normpath(dst_dir)
+    tmp_dir = f"{dst_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    faiss.write_index(vs.index, os.path.join(tmp_dir, "index.faiss"))
+
+    offsets = [0]
+    with open(os.path.join(tmp_dir, "docs.bin"), "wb") as f:
+        for position in range(vs.index.ntotal):
+            doc = vs.docstore.search(vs.index_to_docstore_id[position])
+            record = json.dumps({"page_content": doc.page_content, "metadata": doc.metadata},
+                                ensure_ascii=False).encode("utf-8")
+            f.write(record)
+            offsets.append(offsets[-1] + len(record))
+    np.save(os.path.join(tmp_dir, "offsets.npy"), np.asarray(offsets, dtype="int64"))
+
+    # ✅ Never rewrite files a live worker has mapped: rename the old folder away, the new one in
+    old_dir = f"{dst_dir}.old-{os.getpid()}"
+    if os.path.exists(dst_dir):
+        os.replace(dst_dir, old_dir)
+    os.replace(tmp_dir, dst_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)  # mapped pages stay valid until the workers unmap them
+    return vs.index.ntotal
+
+
+def load_mmap(folder: str, embedding) -> FAISS:
+    """Open an exported vectorstore without reading it into private memory."""
+    index = faiss.read_index(os.path.join(folder, "index.faiss"), MMAP_FLAGS)
+    return FAISS(embedding, index, MmapDocstore(folder), PositionIds(index.ntotal))
+
+
+if __name__ == "__main__":
+    # python mmap_store.py [src_dir] [dst_dir]  -> convert an existing save_local folder
+    import sys
+    src = sys.argv[1] if len(sys.argv) > 1 else "vectorstore"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "vectorstore_mmap"
+    print(f"✅ Exported {export_mmap(src, dst, None)} chunks to {dst}/")
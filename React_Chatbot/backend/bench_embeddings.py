@@ -0,0 +1,55 @@
+"""
+Chunks/sec for each embedding backend on the same 500-char chunks.
+
+    python bench_embeddings.py --file report.pdf
+    python bench_embeddings.py --chunks 512 --batch-size 64 --threads 4
+"""
+import argparse
+import random
+import time
+from embeddings import get_embedding_model
+
+WORDS = "patient hospital admission cost stay outcome treatment report data table value".split()
+
+
+def synthetic_chunks(n, size=500):
+    rng = random.Random(0)
+    return [" ".join(rng.choice(WORDS) for _ in range(size // 7))[:size] for _ in range(n)]
+
+
+def file_chunks(path):
+    from data_loader import extract_pages
+    from qa_engine import split_pages
+
+    return [doc.page_content for doc in split_pages(extract_pages(path))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", help="Embed chunks from this upload instead of synthetic text")
+    parser.add_argument("--chunks", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--skip-ollama", action="store_true")
+    args = parser.parse_args()
+
+    texts = file_chunks(args.file) if args.file else synthetic_chunks(args.chunks)
+    st = {"batch_size": args.batch_size, "threads": args.threads}
+    configs = [
+        ("sentence-transformers (torch)", "sentence-transformers", {**st, "onnx": False}),
+        ("sentence-transformers (onnx int8)", "sentence-transformers", {**st, "onnx": True}),
+    ]
+    if not args.skip_ollama:
+        configs.append(("ollama gemma:2b", "ollama", {}))
+
+    print(f"📄 {len(texts)} chunks")
+    for label, backend, kwargs in configs:
+        try:
+            model = get_embedding_model(backend, **kwargs)
+            model.embed_documents(texts[:2])  # warm-up: model load / first HTTP call
+            start = time.perf_counter()
+            model.embed_documents(texts)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<36}{len(texts) / elapsed:>10.1f} chunks/s")
+        except Exception as e:
+            print(f"{label:<36}   skipped ({e})")
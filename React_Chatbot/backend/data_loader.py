@@ -1,27 +1,60 @@
 import os
 import json
+import shutil
+import tempfile
 import pandas as pd
 import pdfplumber
-from qa_engine import update_vector_store
+from concurrent.futures import ProcessPoolExecutor
+from starlette.concurrency import run_in_threadpool
 
-async def load_file_data(file):
-    file_path = f"temp_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # bytes per read
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
 
-    text = ""
+_pdf_pool = None
+
+
+def _copy_to_temp(src, suffix):
+    # ✅ Unique name per upload; copied in fixed-size chunks, never fully in memory
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix="upload_") as dst:
+        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+        return dst.name
+
+async def save_upload(file):
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    return await run_in_threadpool(_copy_to_temp, file.file, suffix)
+
+def _extract_page_range(file_path, start, stop):
+    with pdfplumber.open(file_path) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def _pdf_pages(file_path):
+    global _pdf_pool
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+    ranges = [(s, min(s + PDF_PAGES_PER_TASK, page_count)) for s in range(0, page_count, PDF_PAGES_PER_TASK)]
+    if len(ranges) <= 1 or PDF_WORKERS <= 1:
+        for start, stop in ranges:
+            yield from _extract_page_range(file_path, start, stop)
+        return
+
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    # ✅ Page ranges extracted in parallel; map() keeps page order
+    results = _pdf_pool.map(_extract_page_range, [file_path] * len(ranges), *zip(*ranges))
+    for pages in results:
+        yield from pages
+
+def extract_pages(file_path):
+    """Yields the upload's text one page (PDF) or one document (CSV/JSON) at a time."""
     if file_path.endswith(".pdf"):
-        with pdfplumber.open(file_path) as pdf:
-            text = "\n".join([page.extract_text() or "" for page in pdf.pages])
+        yield from _pdf_pages(file_path)
     elif file_path.endswith(".csv"):
         df = pd.read_csv(file_path)
-        text = df.to_string(index=False)
+        yield df.to_string(index=False)
     elif file_path.endswith(".json"):
-        data = json.load(open(file_path, "r"))
-        text = json.dumps(data, indent=2)
+        with open(file_path, "r") as f:
+            data = json.load(f)
+        yield json.dumps(data, indent=2)
     else:
-        text = "Unsupported file type"
-
-    os.remove(file_path)
-    update_vector_store(text)
-    return text
+        yield "Unsupported file type"
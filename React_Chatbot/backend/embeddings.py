@@ -0,0 +1,58 @@
+import os
+from typing import List
+from langchain_core.embeddings import Embeddings
+
+# 👉 "sentence-transformers" (in-process, batched) or "ollama" (HTTP, one call per chunk)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", str(os.cpu_count() or 1)))
+# 👉 ONNX Runtime on CPU; the int8 file ships with the all-MiniLM-L6-v2 repo
+EMBEDDING_ONNX = os.getenv("EMBEDDING_ONNX", "false").lower() == "true"
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "gemma:2b")
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Batched in-process sentence encoder, optionally ONNX/int8 on CPU."""
+
+    def __init__(self, model_name=EMBEDDING_MODEL, batch_size=EMBEDDING_BATCH_SIZE,
+                 threads=EMBEDDING_THREADS, onnx=EMBEDDING_ONNX, onnx_file=EMBEDDING_ONNX_FILE):
+        from sentence_transformers import SentenceTransformer
+
+        self.batch_size = batch_size
+        if onnx:
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = threads
+            self.model = SentenceTransformer(
+                model_name, device="cpu", backend="onnx",
+                model_kwargs={"file_name": onnx_file, "session_options": options,
+                              "provider": "CPUExecutionProvider"},
+            )
+        else:
+            import torch
+
+            torch.set_num_threads(threads)
+            self.model = SentenceTransformer(model_name, device="cpu")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.model.encode(
+            texts, batch_size=self.batch_size, normalize_embeddings=True,
+            convert_to_numpy=True, show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def get_embedding_model(backend=EMBEDDING_BACKEND, **kwargs) -> Embeddings:
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbeddings(**kwargs)
+    if backend == "ollama":
+        from langchain_ollama import OllamaEmbeddings
+
+        return OllamaEmbeddings(model=kwargs.get("model_name", OLLAMA_EMBED_MODEL))
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
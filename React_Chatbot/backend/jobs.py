@@ -0,0 +1,156 @@
+import os
+import uuid
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", "64"))
+BUILT_INDEX_CACHE = int(os.getenv("BUILT_INDEX_CACHE", "4"))
+JOB_HISTORY = 100
+
+ACTIVE = ("queued", "running")
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Job:
+    def __init__(self, content_hash: str, file_path: str, filename: str):
+        self.id = uuid.uuid4().hex
+        self.content_hash = content_hash
+        self.file_path = file_path
+        self.filename = filename
+        self.status = "queued"
+        self.done_chunks = 0
+        self.total_chunks = 0
+        self.error = None
+        self.cancelled = threading.Event()
+
+    def to_dict(self) -> dict:
+        progress = self.done_chunks / self.total_chunks if self.total_chunks else 0.0
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "progress": round(progress, 3),
+            "chunks": self.total_chunks,
+            "error": self.error,
+        }
+
+
+class EmbeddingJobQueue:
+    """
+    Single background worker that extracts and embeds uploads one at a time.
+    Identical content (by SHA-256) shares one job, a newer upload supersedes
+    older pending ones, and a finished index is only published if it is
+    still the latest upload.
+    """
+
+    def __init__(self, extract, split, build, publish):
+        self.extract = extract    # file_path -> iterable of page texts
+        self.split = split        # pages -> list of chunks
+        self.build = build        # (chunks, existing index or None) -> index
+        self.publish = publish    # (index) -> None
+        self.jobs = {}
+        self.latest = None        # job the published index should correspond to
+        self._built = OrderedDict()  # content hash -> finished index
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, file_path: str, filename: str) -> Job:
+        content_hash = file_hash(file_path)
+        with self._lock:
+            for job in self.jobs.values():
+                reusable = job.status in ACTIVE or (job.status == "done" and job.content_hash in self._built)
+                if job.content_hash == content_hash and reusable:
+                    os.remove(file_path)  # ✅ Same bytes already queued/embedded
+                    self._supersede(keep=job)
+                    if job.status == "done":
+                        self.publish(self._built[content_hash])
+                    self.latest = job
+                    return job
+
+            job = Job(content_hash, file_path, filename)
+            self.jobs[job.id] = job
+            self._prune()
+            self._supersede(keep=job)
+            self.latest = job
+        self._queue.put(job)
+        return job
+
+    def _prune(self):
+        finished = [j for j in self.jobs.values() if j.status not in ACTIVE and j is not self.latest]
+        for old in finished[:max(0, len(self.jobs) - JOB_HISTORY)]:
+            del self.jobs[old.id]
+
+    def _supersede(self, keep: Job):
+        for job in self.jobs.values():
+            if job is not keep and job.status in ACTIVE:
+                job.cancelled.set()
+                job.status = "superseded"
+
+    def cancel(self, job_id: str) -> Job:
+        with self._lock:
+            job = self.jobs[job_id]
+            if job.status in ACTIVE:
+                job.cancelled.set()
+                job.status = "cancelled"
+            return job
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            # ✅ Check and claim under the lock so a concurrent cancel/supersede is never overwritten
+            with self._lock:
+                if not job.cancelled.is_set():
+                    job.status = "running"
+            if job.status != "running":
+                self._cleanup(job)
+                continue
+            try:
+                index = self._embed(job)
+                with self._lock:
+                    if job.cancelled.is_set():
+                        if job.status in ACTIVE:
+                            job.status = "cancelled"
+                        continue
+                    self._built[job.content_hash] = index
+                    while len(self._built) > BUILT_INDEX_CACHE:
+                        self._built.popitem(last=False)
+                    if self.latest is job:
+                        self.publish(index)  # ✅ Swapped in only once complete
+                    job.status = "done"
+                print(f"✅ Job {job.id[:8]} embedded {job.total_chunks} chunks")
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                print(f"❌ Job {job.id[:8]} failed: {e}")
+            finally:
+                self._cleanup(job)
+
+    def _embed(self, job: Job):
+        if job.content_hash in self._built:
+            return self._built[job.content_hash]
+        chunks = self.split(self.extract(job.file_path))
+        if not chunks:
+            raise ValueError("No text could be extracted from the file.")
+        job.total_chunks = len(chunks)
+        index = None
+        for start in range(0, len(chunks), EMBED_BATCH):
+            if job.cancelled.is_set():
+                return None
+            index = self.build(chunks[start:start + EMBED_BATCH], index)
+            job.done_chunks = min(start + EMBED_BATCH, len(chunks))
+        return index
+
+    def _cleanup(self, job: Job):
+        if os.path.exists(job.file_path):
+            os.remove(job.file_path)
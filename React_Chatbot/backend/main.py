@@ -1,7 +1,9 @@
-from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from qa_engine import answer_question, update_vector_store
-from data_loader import load_file_data
+from starlette.concurrency import run_in_threadpool
+from qa_engine import answer_question, split_pages, build_index, publish_vector_store
+from data_loader import save_upload, extract_pages
+from jobs import EmbeddingJobQueue
 
 app = FastAPI()
 
@@ -13,18 +15,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-data_store = {"content": ""}
+# ✅ One background worker: extraction + embedding happen off the request path
+embedding_jobs = EmbeddingJobQueue(extract_pages, split_pages, build_index, publish_vector_store)
 
 @app.post("/upload/")
-async def upload_file(file: UploadFile = File(...), background_tasks: BackgroundTasks = None):
-    content = await load_file_data(file)
-    data_store["content"] = content
-    background_tasks.add_task(update_vector_store, content)
-    return {"message": "File uploaded. Embedding will be ready shortly."}
+async def upload_file(file: UploadFile = File(...)):
+    file_path = await save_upload(file)
+    job = await run_in_threadpool(embedding_jobs.submit, file_path, file.filename)  # hashing reads the whole file
+    return {"message": "File uploaded. Embedding will be ready shortly.", **job.to_dict()}
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    if job_id not in embedding_jobs.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return embedding_jobs.jobs[job_id].to_dict()
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    if job_id not in embedding_jobs.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return embedding_jobs.cancel(job_id).to_dict()
 
 @app.post("/ask/")
 async def ask_question(question: str = Form(...)):
-    if not data_store["content"]:
+    if embedding_jobs.latest is None:
         return {"answer": "Please upload a data file first."}
     answer = answer_question(question)
     return {"answer": answer}
@@ -2,22 +2,32 @@ from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.chains import RetrievalQA
 from langchain.docstore.document import Document
-from langchain_ollama import OllamaEmbeddings, OllamaLLM
+from langchain_ollama import OllamaLLM
+from embeddings import get_embedding_model
 
 llm = OllamaLLM(model="gemma:2b")
-embedding_model = OllamaEmbeddings(model="gemma:2b")
+embedding_model = get_embedding_model()  # ✅ EMBEDDING_BACKEND picks sentence-transformers or ollama
 vector_db = None
 
-def update_vector_store(text: str):
+def split_pages(pages):
+    """Chunks page by page as pages arrive, tagging each chunk with its page number."""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
+    chunks = []
+    for page_no, text in enumerate(pages, start=1):
+        chunks.extend(splitter.split_documents([Document(page_content=text, metadata={"page": page_no})]))
+    return chunks
+
+def build_index(docs, index=None):
+    """Embeds one batch of chunks into a new or in-progress (unpublished) index."""
+    if index is None:
+        return FAISS.from_documents(docs, embedding_model)
+    index.add_documents(docs)
+    return index
+
+def publish_vector_store(index):
     global vector_db
-    try:
-        print("📄 Splitting and embedding content...")
-        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
-        docs = splitter.split_documents([Document(page_content=text)])
-        vector_db = FAISS.from_documents(docs, embedding_model)
-        print("✅ Vector DB ready.")
-    except Exception as e:
-        print(f"❌ Embedding error: {e}")
+    vector_db = index  # ✅ Single reference swap: readers see the old or new index, never a partial one
+    print("✅ Vector DB ready.")
 
 def answer_question(question: str) -> str:
     global vector_db
@@ -24,7 +24,9 @@ function Chat() {
       });
 
       if (!res.ok) throw new Error(await res.text());
+      const job = await res.json();
       setStatus("✅ File uploaded. Embedding in progress...");
+      pollJob(job.job_id);
     } catch (err) {
       alert("Upload failed: " + err.message);
       setStatus("");
@@ -33,6 +35,29 @@ function Chat() {
     }
   };
 
+  const pollJob = async (jobId) => {
+    try {
+      const res = await fetch(`http://127.0.0.1:8000/jobs/${jobId}`);
+      const job = await res.json();
+      if (job.status === "queued" || job.status === "running") {
+        setStatus(`⏳ Embedding... ${Math.round(job.progress * 100)}%`);
+        setTimeout(() => pollJob(jobId), 1000);
+      } else if (job.status === "done") {
+        setStatus("✅ Embedding ready. Ask away!");
+      } else if (job.status === "failed") {
+        setStatus("❌ Embedding failed: " + job.error);
+      } else if (job.status === "superseded") {
+        setStatus("ℹ️ A newer upload replaced this file before it finished embedding.");
+      } else if (job.status === "cancelled") {
+        setStatus("ℹ️ Embedding was cancelled.");
+      } else {
+        setStatus("");
+      }
+    } catch (err) {
+      setStatus("");
+    }
+  };
+
   const askQuestion = async () => {
     if (!question.trim()) return;
 
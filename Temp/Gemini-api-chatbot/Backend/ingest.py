@@ -0,0 +1,49 @@
+"""
+(Re)build faiss_store/ from the PDFs in data/ with the parallel pipeline.
+
+    python ingest.py --workers 8 --batch-size 64
+"""
+import argparse
+import os
+from langchain_community.vectorstores import FAISS
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from embedding_cache import CachedEmbeddings
+from parallel_ingest import run_pipeline
+
+DATA_DIR = "data"
+FAISS_DIR = "faiss_store"
+
+
+def create_vectorstore(workers=None, batch_size=64):
+    """Extract PDFs in a process pool and embed the chunks in batches (see parallel_ingest.py)."""
+    embeddings = CachedEmbeddings(HuggingFaceEmbeddings())
+    db = None
+
+    def add_batch(texts, vectors, metadatas, ids):
+        nonlocal db
+        if db is None:
+            db = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=metadatas, ids=ids)
+        else:
+            db.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+
+    sources = [
+        (os.path.join(DATA_DIR, filename), filename)
+        for filename in sorted(os.listdir(DATA_DIR))
+        if filename.endswith(".pdf")
+    ]
+    stats = run_pipeline(
+        sources, embeddings, add_batch,
+        chunk_size=2000, chunk_overlap=250,
+        workers=workers, batch_size=batch_size,
+    )
+    db.save_local(FAISS_DIR)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel PDF ingestion into faiss_store/")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="PDF extraction processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="chunks per embedding call")
+    args = parser.parse_args()
+
+    create_vectorstore(workers=args.workers, batch_size=args.batch_size)
@@ -0,0 +1,136 @@
+"""
+Pipelined PDF ingestion.
+
+    PDFs --(process pool: extract + split page ranges)--> bounded chunk queue
+         --(embedding thread: batches of `batch_size`)--> on_batch callback
+
+At most `workers * 2` extraction tasks are in flight and the chunk queue
+holds at most `queue_size` batches, so memory stays flat however large the
+corpus is. Chunk IDs are '<id prefix>:<page>:<n>' and therefore stable for
+an unchanged file.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pypdf import PdfReader
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+PAGES_PER_TASK = int(os.getenv("INGEST_PAGES_PER_TASK", "16"))
+_DONE = object()
+
+
+def extract_and_split(path: str, first_page: int, last_page: int, chunk_size: int, chunk_overlap: int) -> list:
+    """Worker process: text of pages [first_page, last_page) split into chunks."""
+    reader = PdfReader(path)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = []
+    for page in range(first_page, last_page):
+        doc = Document(page_content=reader.pages[page].extract_text() or "",
+                       metadata={"source": path, "page": page})
+        for n, chunk in enumerate(splitter.split_documents([doc])):
+            chunks.append((chunk.page_content, chunk.metadata, n))
+    return chunks
+
+
+def page_tasks(sources: list, pages_per_task: int):
+    """Yield (path, id_prefix, first_page, last_page) covering every page of every PDF."""
+    for path, prefix in sources:
+        page_count = len(PdfReader(path).pages)
+        for first in range(0, page_count, pages_per_task):
+            yield path, prefix, first, min(first + pages_per_task, page_count)
+
+
+def run_pipeline(sources: list, embeddings, on_batch, chunk_size=2000, chunk_overlap=400,
+                 workers=None, batch_size=64, queue_size=8, pages_per_task=PAGES_PER_TASK,
+                 report_every=5.0) -> dict:
+    """
+    Extract, split and embed `sources` ([(pdf path, id prefix), ...]).
+    `on_batch(texts, vectors, metadatas, ids)` is called from the embedding thread.
+    Returns throughput stats plus the chunk IDs produced per id prefix.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_queue = queue.Queue(maxsize=queue_size)
+    stats = {"files": len(sources), "pages": 0, "chunks": 0, "ids": {prefix: [] for _, prefix in sources}}
+    errors = []
+    start = time.perf_counter()
+
+    def embed_worker():
+        try:
+            while True:
+                batch = chunk_queue.get()
+                if batch is _DONE:
+                    return
+                texts = [b[0] for b in batch]
+                vectors = embeddings.embed_documents(texts)
+                on_batch(texts, vectors, [b[1] for b in batch], [b[2] for b in batch])
+                stats["chunks"] += len(batch)
+        except Exception as e:  # surfaced after the producer stops
+            errors.append(e)
+            # keep draining so the producer never blocks on a full queue
+            while chunk_queue.get() is not _DONE:
+                pass
+
+    embedder = threading.Thread(target=embed_worker, daemon=True)
+    embedder.start()
+
+    pending, batch = set(), []
+    last_report = start
+    tasks = page_tasks(sources, pages_per_task)
+
+    def report(final=False):
+        elapsed = time.perf_counter() - start
+        print(f"{'✅' if final else '⏳'} {stats['pages']} pages, {stats['chunks']} chunks embedded "
+              f"in {elapsed:.1f}s ({stats['chunks'] / elapsed if elapsed else 0:.1f} chunks/s)")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            exhausted = False
+            while not exhausted or pending:
+                # ✅ Keep a bounded number of extraction tasks in flight
+                while not exhausted and len(pending) < workers * 2:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    path, prefix, first, last = task
+                    future = pool.submit(extract_and_split, path, first, last, chunk_size, chunk_overlap)
+                    future.task = task
+                    pending.add(future)
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, prefix, first, last = future.task
+                    stats["pages"] += last - first
+                    for text, metadata, n in future.result():
+                        chunk_id = f"{prefix}:{metadata['page']}:{n}"
+                        stats["ids"][prefix].append(chunk_id)
+                        batch.append((text, metadata, chunk_id))
+                        if len(batch) >= batch_size:
+                            chunk_queue.put(batch)  # blocks while the embedder is behind
+                            batch = []
+                if errors:
+                    raise errors[0]
+
+                if report_every and time.perf_counter() - last_report >= report_every:
+                    report()
+                    last_report = time.perf_counter()
+
+        if batch:
+            chunk_queue.put(batch)
+    finally:
+        chunk_queue.put(_DONE)
+        embedder.join()
+
+    if errors:
+        raise errors[0]
+
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    stats["chunks_per_sec"] = round(stats["chunks"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    stats["pages_per_sec"] = round(stats["pages"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    report(final=True)
+    return stats
@@ -1,9 +1,8 @@
 import os
 from dotenv import load_dotenv
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from ingest import create_vectorstore
 from langchain_google_genai import GoogleGenerativeAI
 from langchain.chains import RetrievalQA
 
@@ -12,22 +11,6 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 DATA_DIR = "data"
 FAISS_DIR = "faiss_store"
 
-def load_documents():
-    documents = []
-    for filename in os.listdir(DATA_DIR):
-        if filename.endswith(".pdf"):
-            loader = PyPDFLoader(os.path.join(DATA_DIR, filename))
-            documents.extend(loader.load())
-    return documents
-
-def create_vectorstore():
-    docs = load_documents()
-    splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=250)
-    docs = splitter.split_documents(docs)
-    embeddings = HuggingFaceEmbeddings()
-    db = FAISS.from_documents(docs, embeddings)
-    db.save_local(FAISS_DIR)
-
 def get_rag_chain():
     if not os.path.exists(FAISS_DIR):
         create_vectorstore()
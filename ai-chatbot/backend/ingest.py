@@ -2,6 +2,8 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain.embeddings import HuggingFaceEmbeddings  # ✅ Use fast embeddings
+from embedding_cache import CachedEmbeddings  # ✅ Unchanged chunks are read from disk
+from mmap_store import export_mmap  # ✅ Memory-mappable copy for the API workers
 
 # ✅ Load PDF
 loader = PyPDFLoader("index.pdf")
@@ -12,11 +14,12 @@ splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=250)
 chunks = splitter.split_documents(docs)
 
 # ✅ Use fast Hugging Face model
-embedding = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+embedding = CachedEmbeddings(HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"))
 
 # ✅ Create vector store
 db = FAISS.from_documents(chunks, embedding)
 
 # ✅ Save
 db.save_local("vectorstore")
-print(f"✅ Vectorstore saved with {len(chunks)} chunks!")
+export_mmap("vectorstore", "vectorstore_mmap", embedding)
+print(f"✅ Vectorstore saved with {len(chunks)} chunks! (embedding cache: {embedding.hits} hits, {embedding.misses} new)")
@@ -0,0 +1,99 @@
+import os
+import queue
+import threading
+import time
+
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "200"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))   # seconds
+LOG_BLOCK_TIMEOUT = float(os.getenv("LOG_BLOCK_TIMEOUT", "0"))       # seconds to wait when full; 0 = drop
+
+
+class BatchedLogWriter:
+    """
+    Chat log records go into a bounded queue and a background thread writes
+    them with insert_many once LOG_BATCH_SIZE records are waiting or
+    LOG_FLUSH_INTERVAL has passed. When Mongo falls behind and the queue is
+    full, records are dropped (and counted) unless LOG_BLOCK_TIMEOUT allows
+    the caller to wait.
+    """
+
+    def __init__(self, collection, max_queue=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL, block_timeout=LOG_BLOCK_TIMEOUT):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()  # request threads bump `dropped` concurrently
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict) -> bool:
+        try:
+            if self.block_timeout > 0:
+                self._queue.put(record, timeout=self.block_timeout)  # backpressure
+            else:
+                self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _next_batch(self) -> list:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list):
+        try:
+            self.collection.insert_many(batch, ordered=False)
+            self.written += len(batch)
+            self.flushes += 1
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"❌ Chat log flush failed ({len(batch)} records): {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+        # ✅ Drain whatever is left on shutdown
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                break
+            self._flush(batch)
+
+    def close(self, timeout: float = 10.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
@@ -1,8 +1,13 @@
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from langchain_community.vectorstores import FAISS
 from langchain.embeddings import HuggingFaceEmbeddings  # ✅ new
+from mmap_store import load_mmap, is_current  # ✅ read-only, memory-mapped index shared by workers
+from log_writer import BatchedLogWriter
+from metrics import span, inc, observe, render as render_metrics, register_gauge, CONTENT_TYPE, STAGE_METRIC
+from singleflight import SingleFlight, normalise_question
 
 from langchain_ollama import OllamaLLM  # ✅ NEW
 from langchain.chains import RetrievalQA
@@ -10,6 +15,7 @@ from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
 import time
+from datetime import datetime
 
 load_dotenv()
 
@@ -28,10 +34,22 @@ app.add_middleware(
 client = MongoClient(os.getenv("MONGODB_URI"))
 db = client["chatbot"]
 chatlog = db["logs"]
+log_writer = BatchedLogWriter(chatlog)  # ✅ Off the request path, flushed with insert_many
+for stat in ("queued", "written", "dropped", "failed", "flushes"):
+    register_gauge(f"chat_log_{stat}", lambda stat=stat: log_writer.stats()[stat])
 
-# ✅ Load vector store
+# ✅ Load vector store: the memory-mapped copy (written by ingest.py) is shared by every
+#    uvicorn worker on the host; fall back to the pickled store if it hasn't been exported
+#    (or the export is older than the store, i.e. ingest.py stopped before exporting)
 embedding = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-db_faiss = FAISS.load_local("vectorstore", embedding, allow_dangerous_deserialization=True)
+if is_current("vectorstore_mmap", "vectorstore"):
+    index_dir = "vectorstore_mmap"
+    db_faiss = load_mmap(index_dir, embedding)
+else:
+    index_dir = "vectorstore"
+    db_faiss = FAISS.load_local(index_dir, embedding, allow_dangerous_deserialization=True)
+# 👉 Changes whenever ingest.py rewrites the index, so coalescing never mixes index builds
+index_version = max(os.path.getmtime(os.path.join(index_dir, f)) for f in os.listdir(index_dir))
 
 # ✅ Retrieve more relevant chunks (k=5)
 retriever = db_faiss.as_retriever(search_kwargs={"k": 8})
@@ -43,18 +61,63 @@ qa = RetrievalQA.from_chain_type(llm=OllamaLLM(model="gemma:2b"), retriever=retr
 class Query(BaseModel):
     question: str
 
-@app.post("/ask")
-def ask(q: Query):
+@app.on_event("shutdown")
+def flush_logs():
+    log_writer.close()
+
+# ✅ Identical questions asked at the same moment share one retrieval + generation
+rag_flight = SingleFlight()
+register_gauge("rag_singleflight_leaders", lambda: rag_flight.leaders)
+register_gauge("rag_singleflight_coalesced", lambda: rag_flight.coalesced)
+
+def answer_question(question: str):
+    """Retrieval + generation for one question; returns (answer, chunk count, stage timings in ms)."""
     start = time.time()
-    raw_answer = qa.run(q.question).strip()
+    # 👉 Same steps as qa.run, split so each stage can be timed
+    with span("retrieval"):
+        docs = retriever.invoke(question)
+    retrieved = time.time()
+    inc("rag_chunks_retrieved_total", len(docs))
+    with span("llm"):
+        raw_answer = qa.combine_documents_chain.run(input_documents=docs, question=question).strip()
+    generated = time.time()
     if not raw_answer or "I don't know" in raw_answer.lower():
         answer = "Sorry, I don’t know that."
     else:
         answer = raw_answer
-    chatlog.insert_one({"question": q.question, "answer": answer})
+    timings = {
+        "retrieval": round((retrieved - start) * 1000, 1),
+        "generation": round((generated - retrieved) * 1000, 1),
+    }
+    return answer, len(docs), timings
+
+@app.post("/ask")
+def ask(q: Query):
+    start = time.time()
+    # 👉 Keyed on the normalised question + index version; waiters share the result or the error
+    answer, chunks, timings = rag_flight.do(
+        (normalise_question(q.question), index_version), answer_question, q.question
+    )
+    log_writer.write({
+        "question": q.question,
+        "answer": answer,
+        "timestamp": datetime.utcnow(),
+        "timings_ms": {**timings, "total": round((time.time() - start) * 1000, 1)},
+        "chunks": chunks,
+    })
     print("⏱️ Time taken:", time.time() - start, "seconds")
+    observe(STAGE_METRIC, time.time() - start, stage="ask_total")
     return {"answer": answer}
 
+# ✅ Prometheus scrape endpoint: per-stage p50/p95/p99 and counters
+@app.get("/metrics")
+def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+@app.get("/log-stats")
+def log_stats():
+    return log_writer.stats()
+
 @app.get("/ping-mongo")
 def ping_mongo():
     try:
@@ -0,0 +1,150 @@
+"""
+In-process latency and counter metrics in Prometheus text format.
+
+    with span("faiss_search"):
+        ...
+    inc("rag_cache_hits_total", cache="answers")
+
+Stage timings go into `rag_stage_seconds{stage=...}` and are exported as a
+summary with p50 / p95 / p99 over the last METRICS_WINDOW samples. With
+METRICS_ENABLED=false every call returns immediately.
+
+Everything is per process. Run a single uvicorn worker, or scrape each
+worker on its own: /metrics behind a multi-worker server answers from
+whichever worker gets the request. Every series carries a `worker` label
+(METRICS_WORKER_ID, default the pid) so such samples are never mistaken
+for one continuous series.
+
+The same file is copied into Gemini + Faiss/app/utils, ai-chatbot/backend
+and project/backend (each project is deployed on its own); keep the copies
+identical.
+"""
+import os
+import time
+import threading
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "2048"))  # samples kept per series for quantiles
+METRICS_WORKER_ID = os.getenv("METRICS_WORKER_ID")
+QUANTILES = (0.5, 0.95, 0.99)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+STAGE_METRIC = "rag_stage_seconds"
+
+_lock = threading.Lock()
+_counters = {}   # (name, labels) -> float
+_summaries = {}  # (name, labels) -> [deque of samples, sum, count]
+_gauges = {}     # (name, labels) -> callable returning a number
+_NOOP = nullcontext()
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        series = _summaries.get(key)
+        if series is None:
+            series = _summaries[key] = [deque(maxlen=METRICS_WINDOW), 0.0, 0]
+        series[0].append(value)
+        series[1] += value
+        series[2] += 1
+
+
+def register_gauge(name: str, fn, **labels):
+    """`fn()` is read at scrape time (e.g. a queue length)."""
+    _gauges[_key(name, labels)] = fn
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(STAGE_METRIC, time.perf_counter() - self.start, stage=self.stage)
+        if exc_type is not None:
+            inc("rag_stage_errors_total", stage=self.stage)
+        return False
+
+
+def span(stage: str):
+    """Times a pipeline stage; a shared no-op when metrics are disabled."""
+    return _Span(stage) if METRICS_ENABLED else _NOOP
+
+
+def timed(stage: str):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _labels(labels, extra=()) -> str:
+    # pid read at scrape time: correct even when the app was imported before a fork
+    pairs = list(labels) + list(extra) + [("worker", METRICS_WORKER_ID or os.getpid())]
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    body = ",".join(f'{k}="{escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _quantile(sorted_samples, q: float) -> float:
+    if not sorted_samples:
+        return float("nan")
+    index = min(len(sorted_samples) - 1, int(q * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+def render() -> str:
+    """Everything recorded so far, in Prometheus exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        summaries = {key: (sorted(s[0]), s[1], s[2]) for key, s in _summaries.items()}
+    lines, typed = [], set()
+
+    for (name, labels), value in sorted(counters.items()):
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_labels(labels)} {value}")
+
+    for (name, labels), (samples, total, count) in sorted(summaries.items()):
+        if name not in typed:
+            lines.append(f"# TYPE {name} summary")
+            typed.add(name)
+        for q in QUANTILES:
+            lines.append(f"{name}{_labels(labels, [('quantile', q)])} {_quantile(samples, q)}")
+        lines.append(f"{name}_sum{_labels(labels)} {total}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+
+    for (name, labels), fn in sorted(_gauges.items(), key=lambda item: item[0]):
+        if name not in typed:
+            lines.append(f"# TYPE {name} gauge")
+            typed.add(name)
+        try:
+            lines.append(f"{name}{_labels(labels)} {float(fn())}")
+        except Exception:
+            continue
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,227 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+TABLE_DIR = "vectorstore/tables"
+CSV_CACHE_MB = int(os.getenv("CSV_CACHE_MB", "256"))
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "50000"))  # rows parsed at a time when converting
+CSV_ENCODING = "cp1252"
+MAX_CATEGORIES = 10000  # distinct values tracked per column while deciding types
+
+AGGREGATIONS = [
+    ("mean", re.compile(r"\b(average|avg|mean)\b")),
+    ("median", re.compile(r"\bmedian\b")),
+    ("percentile", re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s*percentile\b")),
+    ("sum", re.compile(r"\b(sum|total)\b")),
+    ("max", re.compile(r"\b(max|maximum|highest|largest|longest)\b")),
+    ("min", re.compile(r"\b(min|minimum|lowest|smallest|shortest)\b")),
+    ("count", re.compile(r"\b(count|how many|number of)\b")),
+]
+GROUP_WORDS = re.compile(r"\b(by|per|each|across)\s+(\w+)")
+STOPWORDS = {"of", "the", "a", "an", "and", "in", "to", "for", "id"}
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", text.lower())) - STOPWORDS
+
+
+def _read_chunks(csv_path: str, chunk_rows: int):
+    for chunk in pd.read_csv(csv_path, encoding=CSV_ENCODING, dtype=str, chunksize=chunk_rows):
+        yield chunk.fillna("")
+
+
+def _column_types(csv_path: str, chunk_rows: int) -> tuple:
+    """
+    First pass over the whole file: numeric-looking columns become numbers,
+    low-cardinality text becomes categories. Deciding up front keeps every
+    chunk written in the second pass on the same schema.
+    """
+    rows, filled, numeric, values = 0, {}, {}, {}
+    for chunk in _read_chunks(csv_path, chunk_rows):
+        rows += len(chunk)
+        for col in chunk.columns:
+            s = chunk[col]
+            filled[col] = filled.get(col, 0) + int(s.ne("").sum())
+            numeric[col] = numeric.get(col, 0) + int(pd.to_numeric(s, errors="coerce").notna().sum())
+            seen = values.setdefault(col, set())
+            if seen is not None:
+                seen.update(s[s.ne("")].unique())
+                if len(seen) > MAX_CATEGORIES:
+                    values[col] = None  # too many to be a category, stop tracking
+
+    limit = min(max(50, rows // 20), MAX_CATEGORIES)
+    types = {}
+    for col in filled:
+        if numeric[col] >= 0.9 * filled[col]:
+            types[col] = ("numeric", None)
+        elif values[col] is not None and len(values[col]) <= limit:
+            types[col] = ("category", sorted(values[col]))
+        else:
+            types[col] = ("text", None)
+    return types, rows
+
+
+def _typed(chunk: pd.DataFrame, types: dict) -> pd.DataFrame:
+    for col, (kind, categories) in types.items():
+        if kind == "numeric":
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("float64")
+        elif kind == "category":
+            chunk[col] = pd.Categorical(chunk[col].mask(chunk[col].eq("")), categories=categories)
+    return chunk
+
+
+class TableCache:
+    """
+    Uploaded CSVs converted once to typed Parquet under TABLE_DIR and kept
+    in an LRU of DataFrames bounded by CSV_CACHE_MB.
+    """
+
+    def __init__(self, root=TABLE_DIR, budget_bytes=CSV_CACHE_MB * 1024 * 1024):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self._tables = OrderedDict()  # csv path -> (mtime, DataFrame, size in bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _parquet_path(self, csv_path: str) -> str:
+        # 👉 Keyed on the full absolute path: data.csv / data.tsv or two folders' data.csv never share a copy
+        digest = hashlib.sha1(os.path.abspath(csv_path).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.root, f"{os.path.basename(csv_path)}-{digest}.parquet")
+
+    def convert(self, csv_path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> str:
+        """
+        Writes the typed Parquet copy chunk by chunk (the CSV is never held in
+        memory whole) unless an up-to-date one exists. Returns its path.
+        """
+        parquet_path = self._parquet_path(csv_path)
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            return parquet_path
+
+        types, rows = _column_types(csv_path, chunk_rows)
+        tmp_path = f"{parquet_path}.{threading.get_ident()}.tmp"
+        writer = None
+        try:
+            for chunk in _read_chunks(csv_path, chunk_rows):
+                table = pa.Table.from_pandas(_typed(chunk, types), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:  # header-only CSV
+            pd.DataFrame(columns=list(types)).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)  # ✅ Parsed and typed once per upload
+        print(f"📦 Cached {os.path.basename(csv_path)} as Parquet ({rows} rows)")
+        return parquet_path
+
+    def get(self, csv_path: str) -> pd.DataFrame:
+        mtime = os.path.getmtime(csv_path)
+        with self._lock:
+            cached = self._tables.get(csv_path)
+            if cached and cached[0] == mtime:
+                self._tables.move_to_end(csv_path)
+                return cached[1]
+
+        df = pd.read_parquet(self.convert(csv_path))
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if csv_path in self._tables:
+                self._bytes -= self._tables.pop(csv_path)[2]
+            self._tables[csv_path] = (mtime, df, size)
+            self._bytes += size
+            while self._bytes > self.budget_bytes and len(self._tables) > 1:
+                _, (_, _, evicted_size) = self._tables.popitem(last=False)
+                self._bytes -= evicted_size
+        return df
+
+
+def _match_column(question_words: set, columns) -> str | None:
+    """Picks the column whose name words overlap the question the most."""
+    best, best_score = None, 0.0
+    for col in columns:
+        words = _words(str(col).replace("_", " "))
+        if not words:
+            continue
+        score = len(words & question_words) / len(words)
+        if score > best_score:
+            best, best_score = col, score
+    return best if best_score >= 0.5 else None
+
+
+def _filters(df: pd.DataFrame, question: str, skip) -> dict:
+    """Category values named in the question, e.g. 'female' -> Gender == Female."""
+    found = {}
+    for col in df.select_dtypes("category").columns:
+        if col in skip:
+            continue
+        for value in df[col].cat.categories:
+            value = str(value)
+            if len(value) >= 3 and re.search(rf"\b{re.escape(value.lower())}\b", question):
+                found.setdefault(col, []).append(value)
+    return found
+
+
+def answer_question(df: pd.DataFrame, question: str) -> str | None:
+    """Maps an analytic question onto filter / group-by / aggregate, or returns None."""
+    q = question.lower()
+    agg, percentile = None, None
+    for name, pattern in AGGREGATIONS:
+        match = pattern.search(q)
+        if match:
+            agg = name
+            if name == "percentile":
+                percentile = int(match.group(1))
+            break
+    if agg is None:
+        return None
+
+    numeric = df.select_dtypes("number").columns
+    categorical = df.select_dtypes("category").columns
+
+    group_col = None
+    for _, word in GROUP_WORDS.findall(q):
+        group_col = _match_column({word}, categorical)
+        if group_col:
+            break
+
+    value_words = _words(GROUP_WORDS.sub(" ", q))
+    value_col = _match_column(value_words, numeric)
+    if value_col is None and agg != "count":
+        return None
+
+    filters = _filters(df, q, skip={group_col})
+    rows = df
+    for col, values in filters.items():
+        rows = rows[rows[col].isin(values)]
+
+    target = rows[value_col] if value_col else rows.iloc[:, 0]
+    if group_col:
+        target = target.groupby(rows[group_col], observed=True)
+
+    if agg == "count":
+        result = target.size() if group_col else len(rows)
+    elif agg == "median":
+        result = target.median()
+    elif agg == "percentile":
+        result = target.quantile(percentile / 100)
+    else:
+        result = getattr(target, agg)()
+
+    label = {"percentile": f"{percentile}th percentile"}.get(agg, agg.capitalize())
+    subject = value_col or "rows"
+    if filters:
+        subject += " where " + ", ".join(f"{c} in {v}" for c, v in filters.items())
+    if group_col:
+        result = {k: round(v, 2) for k, v in result.dropna().to_dict().items()}
+        return f"{label} of {subject} by {group_col}: {result}"
+    return f"{label} of {subject}: {round(float(result), 2)}"
+
+
+tables = TableCache()
@@ -6,14 +6,35 @@ from langchain_community.document_loaders import (
     UnstructuredWordDocumentLoader, UnstructuredExcelLoader, UnstructuredHTMLLoader
 )
 
+CSV_READ_ROWS = int(os.getenv("CSV_READ_ROWS", "5000"))
+CSV_DOC_CHARS = 1000  # Matches the splitter chunk size, so each row group is one chunk
+
+def load_csv_rows(file_path, read_rows=CSV_READ_ROWS, max_chars=CSV_DOC_CHARS):
+    """
+    Streams a CSV in read_rows-sized frames and yields one Document per group
+    of consecutive rows, with row_start/row_end (0-based data rows) in metadata.
+    """
+    reader = pd.read_csv(file_path, encoding='cp1252', dtype=str, chunksize=read_rows)
+    for frame in reader:
+        frame = frame.fillna("")
+        lines, start, size = [], None, 0
+        for row_no, row in zip(frame.index, frame.to_dict(orient="records")):
+            line = " | ".join(f"{k}: {v}" for k, v in row.items())
+            if lines and size + len(line) > max_chars:
+                yield Document(page_content="\n".join(lines), metadata={"source": file_path, "row_start": start, "row_end": int(row_no) - 1})
+                lines, start, size = [], None, 0
+            if start is None:
+                start = int(row_no)
+            lines.append(line)
+            size += len(line) + 1
+        if lines:
+            yield Document(page_content="\n".join(lines), metadata={"source": file_path, "row_start": start, "row_end": int(frame.index[-1])})
+
 def load_file_content(file_path):
     ext = os.path.splitext(file_path)[1].lower()
 
     if ext == ".csv":
-        df = pd.read_csv(file_path, encoding='cp1252', dtype=str).fillna("")
-        rows = df.to_dict(orient="records")
-        texts = [" | ".join(f"{k}: {v}" for k, v in row.items()) for row in rows]
-        return [Document(page_content="\n".join(texts))]
+        return load_csv_rows(file_path)  # ✅ Generator: memory stays flat with file size
 
     loader_map = {
         ".pdf": PyPDFLoader,
@@ -0,0 +1,190 @@
+import os
+import re
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Iterable, List
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from metrics import span, inc
+
+REGISTRY_DIR = "vectorstore/indexes"
+REGISTRY_FILE = "vectorstore/registry.json"
+MEMORY_BUDGET_MB = int(os.getenv("INDEX_MEMORY_BUDGET_MB", "512"))
+
+
+def index_name(raw: str) -> str:
+    """Turns a filename (extension kept: a.pdf and a.csv are different indexes) or workspace label into a safe directory name."""
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", os.path.basename(raw)).strip("._")
+    if not name:
+        raise ValueError(f"Invalid index name: {raw!r}")
+    return name
+
+
+def estimate_bytes(vs: FAISS) -> int:
+    """Vectors are float32; chunk text is counted at one byte per character."""
+    vectors = vs.index.ntotal * vs.index.d * 4
+    text = sum(len(doc.page_content) for doc in vs.docstore._dict.values())
+    return vectors + text
+
+
+def copy_vectorstore(vs: FAISS) -> FAISS:
+    """Independent copy, so a live index can be changed while it keeps serving searches."""
+    return FAISS(
+        vs.embedding_function,
+        faiss.clone_index(vs.index),
+        InMemoryDocstore(dict(vs.docstore._dict)),
+        dict(vs.index_to_docstore_id),
+    )
+
+
+def chunk_ids(source: str, start: int, count: int) -> List[str]:
+    """Deterministic chunk IDs, so a re-uploaded file's old chunks can be found and dropped."""
+    return [f"{source}:{n}" for n in range(start, start + count)]
+
+
+class IndexRegistry:
+    """
+    Named FAISS indexes (one per upload or workspace) persisted under
+    REGISTRY_DIR. Resident indexes sit in an LRU capped by a memory budget;
+    evicted or never-loaded ones are read back from disk on first use.
+    """
+
+    def __init__(self, embedding, root=REGISTRY_DIR, registry_file=REGISTRY_FILE,
+                 budget_bytes=MEMORY_BUDGET_MB * 1024 * 1024):
+        self.embedding = embedding
+        self.root = root
+        self.registry_file = registry_file
+        self.budget_bytes = budget_bytes
+        self._resident = OrderedDict()  # name -> (vectorstore, size in bytes)
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+        self._writers = defaultdict(threading.Lock)  # one upload at a time per index
+        self.entries = self._load_entries()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _load_entries(self) -> dict:
+        if not os.path.exists(self.registry_file):
+            return {}
+        with open(self.registry_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_entries(self):
+        tmp = self.registry_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp, self.registry_file)  # ✅ Never leaves a half-written registry
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _touch(self, name: str, vs: FAISS):
+        """Marks an index as most recently used and evicts cold ones over budget."""
+        if name in self._resident:
+            self._resident_bytes -= self._resident.pop(name)[1]
+        size = estimate_bytes(vs)
+        self._resident[name] = (vs, size)
+        self._resident_bytes += size
+        while self._resident_bytes > self.budget_bytes and len(self._resident) > 1:
+            evicted, (_, evicted_size) = self._resident.popitem(last=False)
+            self._resident_bytes -= evicted_size
+            inc("index_evictions_total")
+            print(f"📤 Evicted index '{evicted}' ({evicted_size / 1e6:.1f} MB)")
+
+    def names(self) -> List[str]:
+        return sorted(self.entries)
+
+    def get(self, name: str) -> FAISS:
+        with self._lock:
+            if name in self._resident:
+                vs = self._resident[name][0]
+            elif name in self.entries:
+                with span("index_load"):
+                    vs = FAISS.load_local(self._path(name), self.embedding, allow_dangerous_deserialization=True)
+                print(f"📥 Loaded index '{name}' from disk")
+            else:
+                raise KeyError(f"Unknown document or workspace: {name}")
+            self._touch(name, vs)
+            return vs
+
+    def add(self, name: str, batches: Iterable[List[Document]], source: str):
+        """
+        Embeds `source` into the named index, creating it on first upload.
+        Re-uploading a file replaces its chunks instead of appending them again.
+        """
+        with self._writers[name]:
+            # ✅ Embedding runs outside the registry lock: searches and other indexes carry on
+            fresh, added = None, 0
+            for chunks in batches:
+                ids = chunk_ids(source, added, len(chunks))
+                if fresh is None:
+                    fresh = FAISS.from_documents(chunks, self.embedding, ids=ids)
+                else:
+                    fresh.add_documents(chunks, ids=ids)
+                added += len(chunks)
+            if fresh is None:
+                raise ValueError(f"No content extracted from {source}")
+
+            entry = self.entries.get(name)
+            if entry is None or entry["files"] == [source]:
+                vs, stale = fresh, None  # new index, or a per-file index being replaced
+            else:
+                # ✅ Change a copy; the resident index keeps answering until the swap below
+                vs = copy_vectorstore(self.get(name))
+                stale = entry.get("file_chunks", {}).get(source, 0)
+                if stale:
+                    vs.delete(chunk_ids(source, 0, stale))
+                elif source in entry["files"]:
+                    print(f"⚠️ Old chunks of {source} in '{name}' predate chunk IDs and are kept")
+                vs.merge_from(fresh)
+            vs.save_local(self._path(name))
+
+            with self._lock:
+                entry = {"files": [], "chunks": 0, "file_chunks": {}} if stale is None else dict(self.entries[name])
+                entry["files"] = [f for f in entry["files"] if f != source] + [source]
+                entry["file_chunks"] = {**entry.get("file_chunks", {}), source: added}
+                entry["chunks"] = entry["chunks"] - (stale or 0) + added
+                self.entries[name] = entry
+                self._save_entries()
+                self._touch(name, vs)
+
+    def files(self, names: List[str]) -> List[str]:
+        return [f for name in names for f in self.entries[name]["files"]]
+
+    def retriever(self, names: List[str], k: int = 5) -> BaseRetriever:
+        missing = [n for n in names if n not in self.entries]
+        if missing:
+            raise KeyError(f"Unknown document or workspace: {', '.join(missing)}")
+        return MultiIndexRetriever(registry=self, names=list(names), k=k)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "indexes": len(self.entries),
+                "resident": list(self._resident),
+                "resident_mb": round(self._resident_bytes / 1e6, 2),
+                "budget_mb": round(self.budget_bytes / 1e6, 2),
+            }
+
+
+class MultiIndexRetriever(BaseRetriever):
+    """Searches each selected index and keeps the k closest chunks overall."""
+
+    registry: IndexRegistry
+    names: List[str]
+    k: int = 5
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        with span("embed"):
+            query_vector = self.registry.embedding.embed_query(query)  # ✅ Embed once for every index
+        hits = []
+        with span("faiss_search"):
+            for name in self.names:
+                hits.extend(self.registry.get(name).similarity_search_with_score_by_vector(query_vector, k=self.k))
+        hits.sort(key=lambda hit: hit[1])  # L2 distance: lower is closer
+        inc("rag_chunks_retrieved_total", min(len(hits), self.k))
+        return [doc for doc, _ in hits[:self.k]]
@@ -1,6 +1,8 @@
 from fastapi import FastAPI, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from rag_engine import load_and_embed, get_qa_chain, handle_structured_csv_question
+from fastapi.responses import Response
+from rag_engine import load_and_embed, get_qa_chain, handle_structured_csv_question, registry
+from metrics import span, inc, render as render_metrics, register_gauge, CONTENT_TYPE
 import shutil, os
 
 app = FastAPI()
@@ -12,42 +14,68 @@ app.add_middleware(
 
 UPLOAD_DIR = "uploaded_files"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
-latest_uploaded_file = None  # 👈 Tracks the last file uploaded
 
 
+# 👉 Plain `def` handlers: file copy, embedding, CSV and LLM calls all block, so FastAPI
+#    runs them in its threadpool and one upload never stalls other users' /ask
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    global latest_uploaded_file
+def upload_file(file: UploadFile = File(...), workspace: str = Form(None)):
     try:
         file_path = os.path.join(UPLOAD_DIR, file.filename)
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
-        load_and_embed(file_path)
-        latest_uploaded_file = file_path
-        return {"message": "File uploaded and embedded successfully."}
+        # 👉 Own index per file, or appended to the named workspace index
+        with span("upload_embed"):
+            document = load_and_embed(file_path, workspace)
+        # 👉 The client keeps this name and sends it back with /ask
+        return {"message": "File uploaded and embedded successfully.", "document": document}
     except Exception as e:
         return {"error": f"Upload failed: {str(e)}"}
 
 
 @app.post("/ask")
-async def ask_question(question: str = Form(...)):
-    global latest_uploaded_file
+def ask_question(question: str = Form(...), documents: str = Form(None)):
     try:
-        if not latest_uploaded_file:
-            return {"error": "No file has been uploaded yet."}
+        # 👉 Comma-separated document/workspace names, chosen by the client
+        names = [d.strip() for d in documents.split(",") if d.strip()] if documents else []
+        if not names:
+            return {"error": "No document selected. Upload a file or pick one from /documents."}
         if not question.strip():
             return {"error": "Question is empty."}
+        unknown = [n for n in names if n not in registry.entries]
+        if unknown:
+            return {"error": f"Unknown documents: {', '.join(unknown)}"}
 
         # 👉 Structured CSV Logic
-        if latest_uploaded_file.endswith(".csv"):
-            csv_result = handle_structured_csv_question(latest_uploaded_file, question)
+        files = registry.files(names)
+        if len(files) == 1 and files[0].endswith(".csv"):
+            with span("csv_engine"):
+                csv_result = handle_structured_csv_question(files[0], question)
             if csv_result:
+                inc("csv_engine_answers_total")
                 return {"answer": csv_result}
 
         # 👉 Default RAG QA Chain
-        qa_chain = get_qa_chain()
-        result = qa_chain.run(question)
+        qa_chain = get_qa_chain(names)
+        with span("rag"):
+            result = qa_chain.run(question)
         return {"answer": result}
 
     except Exception as e:
         return {"error": f"Processing failed: {str(e)}"}
+
+
+@app.get("/documents")
+async def list_documents():
+    return {
+        "documents": {name: registry.entries[name] for name in registry.names()},
+        "memory": registry.stats(),
+    }
+
+
+# ✅ Prometheus scrape endpoint: per-stage p50/p95/p99 and counters
+register_gauge("index_resident_mb", lambda: registry.stats()["resident_mb"])
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
@@ -1,43 +1,48 @@
 import os
-import pandas as pd
-from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.chains import RetrievalQA
 from langchain_ollama import OllamaLLM
 from file_loader import load_file_content
+from embedding_cache import CachedEmbeddings
+from index_registry import IndexRegistry, index_name
+from csv_engine import tables, answer_question
 
-DB_PATH = "vectorstore/db"
 EMBED_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-embedding_model = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+embedding_model = CachedEmbeddings(HuggingFaceEmbeddings(model_name=EMBED_MODEL), EMBED_MODEL)
 llm = OllamaLLM(model="gemma:2b")
-vectordb = None
+registry = IndexRegistry(embedding_model)  # ✅ One index per upload/workspace, LRU-resident
 
-def load_and_embed(file_path):
-    global vectordb
+EMBED_BATCH_CHUNKS = 256
+
+def chunk_batches(docs, batch_size=EMBED_BATCH_CHUNKS):
+    """Splits a (possibly streaming) document iterable into batches of chunks."""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    batch = []
+    for doc in docs:
+        batch.extend(splitter.split_documents([doc]))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def load_and_embed(file_path, workspace=None):
+    """Embeds one file into its own index, or appends it to a workspace index."""
+    name = index_name(workspace or file_path)
     docs = load_file_content(file_path)
-    chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(docs)
-    vectordb = FAISS.from_documents(chunks, embedding_model)
-    vectordb.save_local(DB_PATH)
+    registry.add(name, chunk_batches(docs), file_path)
+    if file_path.endswith(".csv"):
+        tables.convert(file_path)  # ✅ Parquet written at upload time; loaded on the first question
+    return name
 
-def get_qa_chain():
-    global vectordb
-    if vectordb is None:
-        vectordb = FAISS.load_local(DB_PATH, embedding_model)
-    retriever = vectordb.as_retriever(search_kwargs={"k": 5})
+def get_qa_chain(names):
+    retriever = registry.retriever(names, k=5)
     return RetrievalQA.from_chain_type(llm=llm, retriever=retriever, return_source_documents=False)
 
 def handle_structured_csv_question(file_path: str, question: str) -> str | None:
     try:
-        df = pd.read_csv(file_path, encoding='cp1252', dtype=str).fillna("")
-        q_lower = question.lower()
-
-        if "gender" in q_lower and "average" in q_lower and "stay" in q_lower:
-            df["Length_of_Stay"] = pd.to_numeric(df["Length_of_Stay"], errors='coerce')
-            avg = df.groupby("Gender")["Length_of_Stay"].mean().dropna().to_dict()
-            return f"Average Length of Stay by Gender: {avg}"
-
-        # Add more rules below...
-        return None
+        # ✅ Typed Parquet cache + aggregation engine; None falls through to RAG
+        return answer_question(tables.get(file_path), question)
     except Exception as e:
         return f"CSV parsing failed: {str(e)}"
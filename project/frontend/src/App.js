@@ -8,8 +8,24 @@ function App() {
   const [messages, setMessages] = useState([]);
   const [loading, setLoading] = useState(false);
   const [uploadStatus, setUploadStatus] = useState("");
+  const [documents, setDocuments] = useState([]);
+  const [selectedDocs, setSelectedDocs] = useState([]);
   const chatEndRef = useRef(null);
 
+  // Documents and workspaces already on the server
+  useEffect(() => {
+    axios
+      .get("http://localhost:8000/documents")
+      .then((res) => setDocuments(Object.keys(res.data.documents || {})))
+      .catch((error) => console.error("Documents error:", error));
+  }, []);
+
+  const toggleDoc = (name) => {
+    setSelectedDocs((prev) =>
+      prev.includes(name) ? prev.filter((d) => d !== name) : [...prev, name]
+    );
+  };
+
   const handleFileChange = (e) => {
     setFile(e.target.files[0]);
     setUploadStatus("");
@@ -26,7 +42,11 @@ function App() {
     setUploadStatus("Uploading...");
 
     try {
-      await axios.post("http://localhost:8000/upload", formData);
+      const res = await axios.post("http://localhost:8000/upload", formData);
+      if (res.data.error) throw new Error(res.data.error);
+      const name = res.data.document;
+      setDocuments((prev) => (prev.includes(name) ? prev : [...prev, name]));
+      setSelectedDocs([name]);  // ask about the file just uploaded
       setUploadStatus("✅ File uploaded successfully.");
     } catch (error) {
       console.error("Upload error:", error);
@@ -36,16 +56,24 @@ function App() {
 
   const askQuestion = async () => {
     if (!inputValue.trim()) return;
+    if (selectedDocs.length === 0) {
+      alert("Please upload or select a document first.");
+      return;
+    }
 
     setMessages((prev) => [...prev, { from: "user", text: inputValue }]);
     setLoading(true);
 
     const formData = new FormData();
     formData.append("question", inputValue);
+    formData.append("documents", selectedDocs.join(","));
 
     try {
       const res = await axios.post("http://localhost:8000/ask", formData);
-      setMessages((prev) => [...prev, { from: "bot", text: res.data.answer }]);
+      setMessages((prev) => [
+        ...prev,
+        { from: "bot", text: res.data.answer ?? `❌ Error: ${res.data.error}` },
+      ]);
     } catch (error) {
       console.error("Ask error:", error);
       setMessages((prev) => [
@@ -77,6 +105,21 @@ function App() {
       </div>
       {uploadStatus && <p className="status">{uploadStatus}</p>}
 
+      {documents.length > 0 && (
+        <div className="doc-list">
+          {documents.map((name) => (
+            <label key={name} className="doc-item">
+              <input
+                type="checkbox"
+                checked={selectedDocs.includes(name)}
+                onChange={() => toggleDoc(name)}
+              />
+              {name}
+            </label>
+          ))}
+        </div>
+      )}
+
       <div className="chat-box">
         {messages.map((msg, idx) => (
           <div key={idx} className={`message ${msg.from}`}>
@@ -5,16 +5,21 @@ function ChatBox() {
   const [question, setQuestion] = useState("");
   const [answer, setAnswer] = useState("");
   const [file, setFile] = useState(null);
+  const [document, setDocument] = useState(null);
 
   const handleSubmit = async () => {
-    const res = await axios.post("http://localhost:8000/ask", { question });
-    setAnswer(res.data.answer);
+    const formData = new FormData();
+    formData.append("question", question);
+    if (document) formData.append("documents", document);
+    const res = await axios.post("http://localhost:8000/ask", formData);
+    setAnswer(res.data.answer ?? res.data.error);
   };
 
   const handleUpload = async () => {
     const formData = new FormData();
     formData.append("file", file);
-    await axios.post("http://localhost:8000/upload", formData);
+    const res = await axios.post("http://localhost:8000/upload", formData);
+    setDocument(res.data.document);
     alert("File uploaded and processed!");
   };
 
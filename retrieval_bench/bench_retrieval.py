@@ -0,0 +1,297 @@
+"""
+Offline retrieval benchmark for the FAISS vector stores in this repo.
+
+For every store and every setting in the sweep it measures:
+  - query-embedding time
+  - search time (FAISS top-fetch_k)
+  - MMR re-ranking time (mmr settings only)
+  - recall@k against a labelled query set
+  - prompt size (characters and ~tokens) of the "stuff" prompt the chain would send
+
+The saved stores have a fixed chunking. With --docs the source documents
+(PDF / TXT / MD) are also re-split at every --chunk-sizes value (overlap 20%,
+like the projects' 1000/200 and 2000/400), embedded into a fresh index and
+swept the same way, as store "docs".
+
+Latencies are the median over --repeats runs, and the baseline gate only
+flags a latency regression above both the relative limit and an absolute
+--latency-tolerance-ms, so scheduler noise on sub-millisecond searches
+does not fail the run.
+
+No LLM is called; the prompt is only built, as the stubbed final step.
+
+Query set (JSONL), one object per line:
+  {"query": "...", "relevant": ["text that a relevant chunk contains", ...]}
+A label counts as found when any of the top-k chunks contains it (case-insensitive).
+
+    python bench_retrieval.py --queries queries.jsonl --report report.json
+    python bench_retrieval.py --queries queries.jsonl --baseline report.json   # gate: exit 1 on regression
+    python bench_retrieval.py --queries queries.jsonl --stores --docs ../project/backend/uploaded_files
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+import faiss
+import numpy as np
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
+from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MINILM = "sentence-transformers/all-MiniLM-L6-v2"
+
+# name -> (save_local folder, embedding model used to build it)
+STORES = {
+    "gemini-faiss": ("Gemini + Faiss/app/vectorstore", MINILM),
+    "ai-chatbot": ("ai-chatbot/backend/vectorstore", MINILM),
+    "github-ai-chatbot": ("Github upload folder/Ai-chatbot/Backend/vectorstore", MINILM),
+    "project-backend": ("project/backend/vectorstore/db", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"),
+    "temp-gemini": ("Temp/Gemini-api-chatbot/Backend/faiss_store", "sentence-transformers/all-mpnet-base-v2"),
+}
+
+# The settings currently hard-coded across the projects are all part of the default sweep
+K_VALUES = (3, 5, 8, 15)
+FETCH_K_VALUES = (20, 50)
+SEARCH_TYPES = ("similarity", "mmr")
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw")
+CHUNK_SIZES = (500, 1000, 1500, 2000)
+CHUNK_OVERLAP_RATIO = 0.2
+LATENCY_FIELDS = ("search_ms_p50", "search_ms_p95", "mmr_ms_p50")
+
+PROMPT = (
+    "You are a professional AI assistant.\n\n"
+    "### Context:\n{context}\n\n"
+    "### Question:\n{question}\n\n"
+    "### Answer:"
+)
+
+
+def load_queries(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_docs(path: str) -> list:
+    """Source documents for the chunk-size sweep: one file, or every PDF / TXT / MD in a folder."""
+    files = [os.path.join(path, f) for f in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+    docs = []
+    for file in files:
+        if file.lower().endswith(".pdf"):
+            docs.extend(PyPDFLoader(file).load())
+        elif file.lower().endswith((".txt", ".md")):
+            docs.extend(TextLoader(file, encoding="utf-8").load())
+    return docs
+
+
+def rebuild_index(index, index_type: str):
+    """Copy the vectors of `index` into a new index of another type (for the index sweep)."""
+    vectors = index.reconstruct_n(0, index.ntotal)
+    dim = vectors.shape[1]
+    if index_type == "flat":
+        new = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        new = faiss.IndexHNSWFlat(dim, 32)
+        new.hnsw.efSearch = 64
+    else:
+        nlist = max(1, min(int(4 * np.sqrt(len(vectors))), len(vectors) // 39))
+        new = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, nlist)
+        new.train(vectors)
+        new.nprobe = min(16, nlist)
+    new.add(vectors)
+    if faiss.try_extract_index_ivf(new) is not None:
+        new.make_direct_map()
+    return new
+
+
+def recall_at_k(chunks: list, relevant: list) -> float:
+    if not relevant:
+        return 1.0
+    text = "\n".join(chunks).lower()
+    return sum(1 for label in relevant if label.lower() in text) / len(relevant)
+
+
+def run_setting(vs, query_vectors, queries, k, fetch_k, search_type, lambda_mult=0.5):
+    search_ms, mmr_ms, recalls, prompt_chars = [], [], [], []
+    for vector, item in zip(query_vectors, queries):
+        q = np.asarray([vector], dtype="float32")
+        n = fetch_k if search_type == "mmr" else k
+
+        start = time.perf_counter()
+        _, ids = vs.index.search(q, n)
+        search_ms.append((time.perf_counter() - start) * 1000)
+        ids = [i for i in ids[0] if i != -1]
+
+        if search_type == "mmr":
+            start = time.perf_counter()
+            candidates = [vs.index.reconstruct(int(i)) for i in ids]
+            picked = maximal_marginal_relevance(q[0], candidates, k=k, lambda_mult=lambda_mult)
+            ids = [ids[i] for i in picked]
+            mmr_ms.append((time.perf_counter() - start) * 1000)
+
+        chunks = [vs.docstore.search(vs.index_to_docstore_id[int(i)]).page_content for i in ids[:k]]
+        recalls.append(recall_at_k(chunks, item.get("relevant", [])))
+        # Stubbed LLM step: build the prompt the chain would send, but don't send it
+        prompt_chars.append(len(PROMPT.format(context="\n\n".join(chunks), question=item["query"])))
+
+    return {
+        "search_ms_p50": statistics.median(search_ms),
+        "search_ms_p95": float(np.percentile(search_ms, 95)),
+        "mmr_ms_p50": statistics.median(mmr_ms) if mmr_ms else 0.0,
+        "recall_at_k": statistics.mean(recalls),
+        "prompt_chars": statistics.mean(prompt_chars),
+        "prompt_tokens_est": statistics.mean(prompt_chars) / 4,  # ~4 chars per token for English
+    }
+
+
+def median_of_runs(runs: list) -> dict:
+    """Latencies: median over the repeats. Recall and prompt size are the same every run."""
+    row = dict(runs[0])
+    for field in LATENCY_FIELDS:
+        row[field] = statistics.median(run[field] for run in runs)
+    return row
+
+
+def bench_store(name, folder, model, queries, args) -> list:
+    embedding = HuggingFaceEmbeddings(model_name=model)
+    vs = FAISS.load_local(os.path.join(ROOT, folder), embedding, allow_dangerous_deserialization=True)
+    if faiss.try_extract_index_ivf(vs.index) is not None:
+        faiss.try_extract_index_ivf(vs.index).make_direct_map()  # MMR needs reconstruct()
+    return bench_vectorstore(name, vs, embedding, queries, args)
+
+
+def bench_chunk_sizes(docs_path, model, queries, args) -> list:
+    """Re-split the source documents at each chunk size into a fresh flat index and sweep it."""
+    embedding = HuggingFaceEmbeddings(model_name=model)
+    docs = load_docs(docs_path)
+    if not docs:
+        print(f"⚠️ No PDF / TXT / MD documents in {docs_path}, skipping the chunk-size sweep")
+        return []
+    rows = []
+    for size in args.chunk_sizes:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=int(size * CHUNK_OVERLAP_RATIO))
+        chunks = splitter.split_documents(docs)
+        print(f"📊 docs @ chunk_size={size} ({len(chunks)} chunks, {model})")
+        vs = FAISS.from_documents(chunks, embedding)
+        rows.extend(bench_vectorstore("docs", vs, embedding, queries, args, chunk_size=size))
+    return rows
+
+
+def bench_vectorstore(name, vs, embedding, queries, args, chunk_size=None) -> list:
+    chunk_chars = statistics.mean(len(d.page_content) for d in vs.docstore._dict.values())
+
+    embed_runs = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        query_vectors = [embedding.embed_query(item["query"]) for item in queries]
+        embed_runs.append((time.perf_counter() - start) * 1000 / len(queries))
+    embed_ms = statistics.median(embed_runs)
+
+    rows = []
+    original_index = vs.index
+    for index_type in args.index_types:
+        vs.index = original_index if index_type == "flat" else rebuild_index(original_index, index_type)
+        for k, fetch_k, search_type in itertools.product(args.k, args.fetch_k, args.search_types):
+            if search_type == "similarity" and fetch_k != args.fetch_k[0]:
+                continue  # fetch_k only matters for MMR
+            if fetch_k < k:
+                continue
+            row = {
+                "store": name, "chunk_size": chunk_size, "index": index_type, "search": search_type,
+                "k": k, "fetch_k": fetch_k if search_type == "mmr" else None,
+                "chunks": original_index.ntotal, "avg_chunk_chars": round(chunk_chars),
+                "embed_ms": embed_ms,
+            }
+            runs = [run_setting(vs, query_vectors, queries, k, fetch_k, search_type) for _ in range(args.repeats)]
+            row.update(median_of_runs(runs))
+            rows.append(row)
+            print(f"  {index_type:<9}{search_type:<11}k={k:<3}fetch_k={str(row['fetch_k']):<5}"
+                  f"recall={row['recall_at_k']:.3f}  search={row['search_ms_p50']:.2f}ms  "
+                  f"mmr={row['mmr_ms_p50']:.2f}ms  prompt~{row['prompt_tokens_est']:.0f} tok")
+    return rows
+
+
+def setting_key(row) -> tuple:
+    return row["store"], row.get("chunk_size"), row["index"], row["search"], row["k"], row["fetch_k"]
+
+
+def compare(rows, baseline_path, max_recall_drop, max_latency_increase, latency_tolerance_ms=0.0) -> list:
+    """
+    Regressions of `rows` against a previous report. Latency only counts when it
+    is both `max_latency_increase` (relative) and `latency_tolerance_ms` slower.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {setting_key(r): r for r in json.load(f)["results"]}
+    problems = []
+    for row in rows:
+        old = baseline.get(setting_key(row))
+        if old is None:
+            continue
+        if row["recall_at_k"] < old["recall_at_k"] - max_recall_drop:
+            problems.append(f"{setting_key(row)}: recall {old['recall_at_k']:.3f} -> {row['recall_at_k']:.3f}")
+        old_ms = old["embed_ms"] + old["search_ms_p50"] + old["mmr_ms_p50"]
+        new_ms = row["embed_ms"] + row["search_ms_p50"] + row["mmr_ms_p50"]
+        if old_ms and new_ms > old_ms * (1 + max_latency_increase) and new_ms - old_ms > latency_tolerance_ms:
+            problems.append(f"{setting_key(row)}: latency {old_ms:.2f}ms -> {new_ms:.2f}ms")
+    return problems
+
+
+def write_markdown(rows, path):
+    cols = ["store", "chunk_size", "index", "search", "k", "fetch_k", "avg_chunk_chars", "embed_ms",
+            "search_ms_p50", "mmr_ms_p50", "recall_at_k", "prompt_tokens_est"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("| " + " | ".join(cols) + " |\n")
+        f.write("|" + "---|" * len(cols) + "\n")
+        for row in rows:
+            cells = [f"{row[c]:.3f}" if isinstance(row[c], float) else str(row[c]) for c in cols]
+            f.write("| " + " | ".join(cells) + " |\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline retrieval benchmark")
+    parser.add_argument("--queries", required=True, help="labelled query set (JSONL)")
+    parser.add_argument("--stores", nargs="*", default=list(STORES), choices=list(STORES))
+    parser.add_argument("--k", nargs="+", type=int, default=list(K_VALUES))
+    parser.add_argument("--fetch-k", nargs="+", type=int, default=list(FETCH_K_VALUES))
+    parser.add_argument("--search-types", nargs="+", default=list(SEARCH_TYPES), choices=SEARCH_TYPES)
+    parser.add_argument("--index-types", nargs="+", default=["flat"], choices=INDEX_TYPES)
+    parser.add_argument("--docs", help="source documents (file or folder) for the chunk-size sweep")
+    parser.add_argument("--docs-model", default=MINILM, help="embedding model for the chunk-size sweep")
+    parser.add_argument("--chunk-sizes", nargs="+", type=int, default=list(CHUNK_SIZES))
+    parser.add_argument("--repeats", type=int, default=5, help="runs per setting; latencies are the median")
+    parser.add_argument("--report", default="retrieval_report.json")
+    parser.add_argument("--baseline", help="previous report; exit 1 if recall or latency regress")
+    parser.add_argument("--max-recall-drop", type=float, default=0.02)
+    parser.add_argument("--max-latency-increase", type=float, default=0.25)
+    parser.add_argument("--latency-tolerance-ms", type=float, default=1.0,
+                        help="ignore latency changes smaller than this, whatever the ratio")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    results = []
+    for name in args.stores:
+        folder, model = STORES[name]
+        if not os.path.exists(os.path.join(ROOT, folder, "index.faiss")):
+            print(f"⚠️ {name}: no index at {folder}, skipping")
+            continue
+        print(f"📊 {name} ({model})")
+        results.extend(bench_store(name, folder, model, queries, args))
+    if args.docs:
+        results.extend(bench_chunk_sizes(args.docs, args.docs_model, queries, args))
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump({"queries": len(queries), "results": results}, f, indent=2)
+    write_markdown(results, os.path.splitext(args.report)[0] + ".md")
+    print(f"✅ Report written to {args.report}")
+
+    if args.baseline:
+        problems = compare(results, args.baseline, args.max_recall_drop, args.max_latency_increase,
+                           args.latency_tolerance_ms)
+        for p in problems:
+            print(f"❌ {p}")
+        sys.exit(1 if problems else 0)